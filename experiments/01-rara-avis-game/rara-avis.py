@@ -1,15 +1,49 @@
-import pygame
 import sys
+import time
+STARTUP_BEGIN = time.perf_counter()  # time zero for --startup-profile
+
+# pygame only uses pkg_resources to locate its bundled data files and falls
+# back to plain paths without it; not importing it saves ~100 ms of startup.
+if "pkg_resources" not in sys.modules:
+    sys.modules["pkg_resources"] = None
+import pygame
+import argparse
+import os
 import random
 import math
-
-# Initialize pygame
-pygame.init()
-
-# Screen dimensions
-WIDTH, HEIGHT = 800, 600
-screen = pygame.display.set_mode((WIDTH, HEIGHT))
-pygame.display.set_caption("Rara Avis - Flappy Bird Clone")
+from collections import OrderedDict
+from itertools import chain
+
+import numpy as np
+
+import rara_sim
+from rara_sim import (WIDTH, HEIGHT, FPS, PIPE_SPEED, PIPE_GAP, GROUND_HEIGHT,
+                      BIRD_WIDTH, BIRD_HEIGHT, PIPE_WIDTH)
+
+# Helpers shared by the experiment games live in experiments/shared
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), os.pardir, "shared"))
+from textcache import TextCache, NumberText
+from dirtyrects import DirtyRects
+from timestep import FixedTimestep, lerp
+from profiler import FrameProfiler, ProfilerOverlay
+from startup import StartupProfile, sys_font
+from replay import Replay, ReplayWriter, seek
+from capture import FrameCapture
+from gcpacer import GCPacer, AllocationSampler
+from quality import QualityGovernor
+from scaling import ScaledDisplay, SCALERS, parse_size
+
+# Display and fonts are created by init_display(), not at import time, so the
+# module can be imported headless (the game logic lives in rara_sim).
+screen = None
+display = None  # ScaledDisplay when the window is scaled
+font_large = None
+font_medium = None
+font_small = None
+text_cache = TextCache()
+score_text = None
+high_score_text = None
+overlays = {}  # alpha: full-screen dimming surface
 
 # Colors
 SKY_BLUE = (135, 206, 235)
@@ -22,120 +56,207 @@ BUTTON_COLOR = (70, 130, 180)
 BUTTON_HOVER = (100, 149, 237)
 RED = (220, 20, 60)
 GREEN = (50, 205, 50)
-
-# Game variables
-FPS = 60
-GRAVITY = 0.5
-FLAP_STRENGTH = -8
-PIPE_SPEED = 3
-PIPE_GAP = 180
-PIPE_FREQUENCY = 1800  # milliseconds
-GROUND_HEIGHT = 100
-BIRD_WIDTH, BIRD_HEIGHT = 40, 30
-PIPE_WIDTH = 70
-
-# Font setup
-font_large = pygame.font.SysFont("Arial", 48, bold=True)
-font_medium = pygame.font.SysFont("Arial", 36)
-font_small = pygame.font.SysFont("Arial", 24)
-
-class Bird:
+BIRD_WING = (255, 200, 0)
+PIPE_OUTLINE = (50, 120, 50)
+COLORKEY = (255, 0, 255)  # transparent color of cached sprites
+
+# Sprite cache
+WING_STEP = 0.1  # wing_angle resolution of the cached bird poses
+WING_POSES = 7  # poses cached on each side of a level wing (|wing_angle| <= 0.7)
+PIPE_CACHE_SIZE = 8  # pipe columns kept (at most 3 pipes are on screen)
+
+# Particle trail
+PARTICLE_COLORS = [
+    (255, 255, 100),  # Light yellow
+    (255, 220, 50),   # Golden
+    (255, 200, 0),    # Yellow
+    (255, 180, 50),   # Orange-yellow
+]
+PARTICLE_RATE = 0.5  # particles emitted per frame
+PARTICLE_CAPACITY = 4096
+PARTICLE_MAX_LIFETIME = 40
+PARTICLE_MAX_SIZE = 6
+PARTICLE_ALPHA_LEVELS = 16  # alpha steps of the pre-tinted particle sprites
+
+# Background layers
+CLOUD_WHITE = (250, 250, 250)
+CLOUD_LAYERS = [(3, 0.5), (2, 1.2)]  # (clouds, scroll speed) from far to near
+CLOUD_STRIP_HEIGHT = 270  # tallest cloud reaches y = 200 + 60
+GROUND_DETAIL_SPACING = 30
+background_layers = []
+ground_layer = None
+
+# Quality levels, cheapest last, stepped through by --quality auto when frames
+# run long: (particles per frame, cloud layers drawn, pipe outlines, antialiased text)
+QUALITY_LEVELS = [
+    (PARTICLE_RATE, len(CLOUD_LAYERS), True, True),
+    (PARTICLE_RATE / 2, len(CLOUD_LAYERS), True, True),
+    (PARTICLE_RATE / 2, 1, True, True),
+    (PARTICLE_RATE / 2, 1, False, True),
+    (PARTICLE_RATE / 2, 1, False, False),
+    (0, 0, False, False),
+]
+particle_rate, cloud_layers, pipe_outlines, text_antialias = QUALITY_LEVELS[0]
+
+# Game actions, as recorded in replays
+START, FLAP, PAUSE, RESUME, RESTART = range(5)
+
+# Window events after which even a static screen must be drawn again
+REDRAW_EVENTS = (pygame.VIDEOEXPOSE, pygame.WINDOWEXPOSED, pygame.VIDEORESIZE)
+
+def init_display(offscreen=False, window_size=None, fullscreen=False, scaler="sdl"):
+    global screen, display, font_large, font_medium, font_small, score_text, high_score_text
+
+    # Initialize only the pygame subsystems the game uses (it has no sound)
+    pygame.display.init()
+    pygame.font.init()
+    if offscreen:
+        # Draw into a plain surface (e.g. for observe.PixelObserver); the hidden
+        # 1x1 window only provides the pixel format sprites are converted to
+        pygame.display.set_mode((1, 1), pygame.HIDDEN)
+        screen = pygame.Surface((WIDTH, HEIGHT)).convert()
+        display = None
+    elif window_size or fullscreen:
+        # Draw at WIDTH x HEIGHT whatever the window size, and scale once per frame
+        display = ScaledDisplay((WIDTH, HEIGHT), window_size, fullscreen, scaler)
+        screen = display.surface
+        pygame.display.set_caption("Rara Avis - Flappy Bird Clone")
+    else:
+        display = None
+        screen = pygame.display.set_mode((WIDTH, HEIGHT))
+        pygame.display.set_caption("Rara Avis - Flappy Bird Clone")
+
+    # Font setup
+    font_large = sys_font("Arial", 48, bold=True)
+    font_medium = sys_font("Arial", 36)
+    font_small = sys_font("Arial", 24)
+    # Surfaces and fonts from an earlier display do not survive pygame.quit()
+    text_cache.clear()
+    sprites.invalidate()
+    score_text = NumberText(text_cache, font_medium, "Score: ", TEXT_COLOR, text_antialias)
+    high_score_text = NumberText(text_cache, font_medium, "High Score: ", TEXT_COLOR, text_antialias)
+
+def apply_quality(level):
+    """Switch to one of QUALITY_LEVELS; takes effect from the next frame drawn."""
+    global particle_rate, cloud_layers, pipe_outlines, text_antialias, score_text, high_score_text
+    antialias = text_antialias
+    particle_rate, cloud_layers, pipe_outlines, text_antialias = QUALITY_LEVELS[level]
+    if text_antialias != antialias and score_text is not None:
+        score_text = NumberText(text_cache, font_medium, "Score: ", TEXT_COLOR, text_antialias)
+        high_score_text = NumberText(text_cache, font_medium, "High Score: ", TEXT_COLOR, text_antialias)
+
+def make_sprite(width, height):
+    """Blank sprite in the display format, transparent where left unpainted."""
+    surface = pygame.Surface((width, height)).convert()
+    surface.fill(COLORKEY)
+    surface.set_colorkey(COLORKEY, pygame.RLEACCEL)
+    return surface
+
+class SpriteAtlas:
+    """Bird poses and pipe columns rendered once, so each entity draws with a single blit.
+
+    The cache is keyed on the palette it was drawn with and is rebuilt when
+    any of those color constants change.
+    """
     def __init__(self):
-        self.x = WIDTH // 3
-        self.y = HEIGHT // 2
-        self.velocity = 0
-        self.alive = True
-        self.flap_count = 0
-        self.wing_angle = 0
-        self.wing_direction = 1
-
-    def flap(self):
-        if self.alive:
-            self.velocity = FLAP_STRENGTH
-            self.flap_count += 1
-
-    def update(self):
-        # Apply gravity
-        self.velocity += GRAVITY
-        self.y += self.velocity
-
-        # Update wing animation
-        self.wing_angle += 0.2 * self.wing_direction
-        if abs(self.wing_angle) > 0.5:
-            self.wing_direction *= -1
-
-        # Check if bird hits the ground or ceiling
-        if self.y >= HEIGHT - GROUND_HEIGHT - BIRD_HEIGHT:
-            self.y = HEIGHT - GROUND_HEIGHT - BIRD_HEIGHT
-            self.alive = False
-        if self.y <= 0:
-            self.y = 0
-            self.velocity = 0
+        self.palette = None
+        self.bird_poses = []
+        self.pipe_columns = OrderedDict()
+
+    def invalidate(self):
+        self.palette = None
+
+    def validate(self):
+        palette = (BIRD_YELLOW, BIRD_ORANGE, BIRD_WING, PIPE_GREEN, PIPE_OUTLINE)
+        if palette != self.palette:
+            self.palette = palette
+            self.bird_poses = [self.render_bird((i - WING_POSES) * WING_STEP)
+                               for i in range(2 * WING_POSES + 1)]
+            self.pipe_columns.clear()
+            for pose in self.bird_poses:
+                if self.row_spans(pose) != rara_sim.BIRD_SPANS:
+                    raise RuntimeError("the bird sprite no longer matches rara_sim.BIRD_SPANS")
+
+    def bird(self, wing_angle):
+        pose = round(wing_angle / WING_STEP) + WING_POSES
+        return self.bird_poses[min(max(pose, 0), 2 * WING_POSES)]
+
+    def pipe(self, height):
+        column = self.pipe_columns.get(height)
+        if column is None:
+            column = self.pipe_columns[height] = self.render_pipe(height)
+            if len(self.pipe_columns) > PIPE_CACHE_SIZE:
+                self.pipe_columns.popitem(last=False)
+        else:
+            self.pipe_columns.move_to_end(height)
+        return column
+
+    @staticmethod
+    def row_spans(sprite):
+        """(first x, last x + 1) of the opaque pixels in each row, as in rara_sim.BIRD_SPANS."""
+        opaque = pygame.surfarray.array_colorkey(sprite).T > 0
+        first = opaque.argmax(axis=1)
+        last = opaque.shape[1] - opaque[:, ::-1].argmax(axis=1)
+        return tuple(zip(first.tolist(), last.tolist()))
+
+    @staticmethod
+    def render_bird(wing_angle):
+        surface = make_sprite(BIRD_WIDTH + 11, BIRD_HEIGHT)  # beak tip column is inclusive
 
-    def draw(self):
         # Draw bird body
-        pygame.draw.ellipse(screen, BIRD_YELLOW, (self.x, self.y, BIRD_WIDTH, BIRD_HEIGHT))
+        pygame.draw.ellipse(surface, BIRD_YELLOW, (0, 0, BIRD_WIDTH, BIRD_HEIGHT))
 
         # Draw bird eye
-        pygame.draw.circle(screen, (0, 0, 0), (self.x + BIRD_WIDTH - 10, self.y + 10), 5)
-        pygame.draw.circle(screen, (255, 255, 255), (self.x + BIRD_WIDTH - 12, self.y + 8), 2)
+        pygame.draw.circle(surface, (0, 0, 0), (BIRD_WIDTH - 10, 10), 5)
+        pygame.draw.circle(surface, (255, 255, 255), (BIRD_WIDTH - 12, 8), 2)
 
         # Draw bird beak
-        beak_points = [
-            (self.x + BIRD_WIDTH, self.y + 15),
-            (self.x + BIRD_WIDTH + 10, self.y + 12),
-            (self.x + BIRD_WIDTH + 10, self.y + 18)
-        ]
-        pygame.draw.polygon(screen, BIRD_ORANGE, beak_points)
+        beak_points = [(BIRD_WIDTH, 15), (BIRD_WIDTH + 10, 12), (BIRD_WIDTH + 10, 18)]
+        pygame.draw.polygon(surface, BIRD_ORANGE, beak_points)
 
         # Draw wing
-        wing_points = [
-            (self.x + 10, self.y + 15),
-            (self.x + 20, self.y + 15 + self.wing_angle * 10),
-            (self.x + 30, self.y + 15)
-        ]
-        pygame.draw.polygon(screen, (255, 200, 0), wing_points)
-
-    def get_mask(self):
-        # Simple collision mask for bird
-        return pygame.Rect(self.x, self.y, BIRD_WIDTH, BIRD_HEIGHT)
-
-class Pipe:
-    def __init__(self):
-        self.x = WIDTH
-        self.height = random.randint(100, HEIGHT - GROUND_HEIGHT - PIPE_GAP - 100)
-        self.top_pipe = pygame.Rect(self.x, 0, PIPE_WIDTH, self.height)
-        self.bottom_pipe = pygame.Rect(self.x, self.height + PIPE_GAP, PIPE_WIDTH, HEIGHT - self.height - PIPE_GAP)
-        self.passed = False
-        self.scored = False
-
-    def update(self):
-        self.x -= PIPE_SPEED
-        self.top_pipe.x = self.x
-        self.bottom_pipe.x = self.x
-
-    def draw(self):
-        # Draw top pipe
-        pygame.draw.rect(screen, PIPE_GREEN, self.top_pipe)
-        pygame.draw.rect(screen, (50, 120, 50), self.top_pipe, 3)
-
-        # Draw pipe cap
-        cap_rect = pygame.Rect(self.x - 5, self.height - 20, PIPE_WIDTH + 10, 20)
-        pygame.draw.rect(screen, PIPE_GREEN, cap_rect)
-        pygame.draw.rect(screen, (50, 120, 50), cap_rect, 3)
-
-        # Draw bottom pipe
-        pygame.draw.rect(screen, PIPE_GREEN, self.bottom_pipe)
-        pygame.draw.rect(screen, (50, 120, 50), self.bottom_pipe, 3)
-
-        # Draw pipe cap
-        cap_rect = pygame.Rect(self.x - 5, self.height + PIPE_GAP, PIPE_WIDTH + 10, 20)
-        pygame.draw.rect(screen, PIPE_GREEN, cap_rect)
-        pygame.draw.rect(screen, (50, 120, 50), cap_rect, 3)
-
-    def collide(self, bird):
-        bird_mask = bird.get_mask()
-        return bird_mask.colliderect(self.top_pipe) or bird_mask.colliderect(self.bottom_pipe)
+        wing_points = [(10, 15), (20, 15 + wing_angle * 10), (30, 15)]
+        pygame.draw.polygon(surface, BIRD_WING, wing_points)
+        return surface
+
+    @staticmethod
+    def render_pipe(height):
+        # Top and bottom pipe with their caps; the part below the ground is never seen
+        surface = make_sprite(PIPE_WIDTH + 10, HEIGHT - GROUND_HEIGHT)
+        top_pipe = pygame.Rect(5, 0, PIPE_WIDTH, height)
+        bottom_pipe = pygame.Rect(5, height + PIPE_GAP, PIPE_WIDTH, HEIGHT - height - PIPE_GAP)
+        top_cap = pygame.Rect(0, height - 20, PIPE_WIDTH + 10, 20)
+        bottom_cap = pygame.Rect(0, height + PIPE_GAP, PIPE_WIDTH + 10, 20)
+
+        for rect in (top_pipe, top_cap, bottom_pipe, bottom_cap):
+            pygame.draw.rect(surface, PIPE_GREEN, rect)
+            pygame.draw.rect(surface, PIPE_OUTLINE, rect, 3)
+        return surface
+
+sprites = SpriteAtlas()
+
+class Bird(rara_sim.Bird):
+    __slots__ = ()
+
+    def draw(self, alpha=1.0):
+        screen.blit(sprites.bird(self.wing_angle), (self.x, lerp(self.prev_y, self.y, alpha)))
+
+class Pipe(rara_sim.Pipe):
+    __slots__ = ()
+
+    def draw(self, alpha=1.0):
+        x = lerp(self.prev_x, self.x, alpha)
+        if pipe_outlines:
+            screen.blit(sprites.pipe(self.height), (x - 5, 0))
+        else:
+            # Plain shafts: two fills, and no column sprite to render for a new height
+            bottom = self.height + PIPE_GAP
+            screen.fill(PIPE_GREEN, (x, 0, PIPE_WIDTH, self.height))
+            screen.fill(PIPE_GREEN, (x, bottom, PIPE_WIDTH, HEIGHT - GROUND_HEIGHT - bottom))
+
+class Simulation(rara_sim.Simulation):
+    bird_class = Bird
+    pipe_class = Pipe
 
 class Button:
     def __init__(self, x, y, width, height, text):
@@ -148,7 +269,7 @@ class Button:
         pygame.draw.rect(screen, color, self.rect, border_radius=10)
         pygame.draw.rect(screen, (30, 30, 30), self.rect, 3, border_radius=10)
 
-        text_surf = font_medium.render(self.text, True, TEXT_COLOR)
+        text_surf = text_cache.render(font_medium, self.text, TEXT_COLOR, text_antialias)
         text_rect = text_surf.get_rect(center=self.rect.center)
         screen.blit(text_surf, text_rect)
 
@@ -160,102 +281,246 @@ class Button:
             return self.rect.collidepoint(pos)
         return False
 
-class Particle:
-    def __init__(self, x, y):
-        self.x = x
-        self.y = y
-        self.vx = random.uniform(-1, -0.5)
-        self.vy = random.uniform(-1, 1)
-        self.lifetime = random.randint(20, 40)
-        self.size = random.randint(3, 6)
-        self.color = random.choice([
-            (255, 255, 100),  # Light yellow
-            (255, 220, 50),   # Golden
-            (255, 200, 0),    # Yellow
-            (255, 180, 50),   # Orange-yellow
-        ])
+class ParticleSystem:
+    """Fixed-capacity particle pool stored as parallel NumPy arrays.
+
+    Live particles occupy ``[0, count)`` in emission order. ``update`` moves
+    them all at once and compacts the survivors in a single pass; when the
+    pool is full the oldest particles are evicted to make room. Particles are
+    drawn with one ``blits`` call from sprites pre-tinted per color, radius and
+    alpha level, so alpha fades out with the remaining lifetime.
+    """
+    def __init__(self, seed=None, capacity=PARTICLE_CAPACITY):
+        self.capacity = capacity
+        self.count = 0
+        self.version = 0  # bumped whenever the particles change
+        self.rng = np.random.default_rng(seed)
+        self.x = np.zeros(capacity, dtype=np.float32)
+        self.y = np.zeros(capacity, dtype=np.float32)
+        self.vx = np.zeros(capacity, dtype=np.float32)
+        self.vy = np.zeros(capacity, dtype=np.float32)
+        self.lifetime = np.zeros(capacity, dtype=np.int16)
+        self.size = np.zeros(capacity, dtype=np.float32)
+        self.color = np.zeros(capacity, dtype=np.int8)
+        self.fields = (self.x, self.y, self.vx, self.vy, self.lifetime, self.size, self.color)
+        self.sprites = None
+
+    def clear(self):
+        self.count = 0
+        self.version += 1
+
+    def emit(self, x, y, rate=PARTICLE_RATE):
+        n = int(rate) + (self.rng.random() < rate % 1)
+        if n == 0:
+            return
+        n = min(n, self.capacity)
+
+        # Evict the oldest particles if the pool is full
+        overflow = self.count + n - self.capacity
+        if overflow > 0:
+            keep = self.count - overflow
+            for field in self.fields:
+                field[:keep] = field[overflow:self.count]
+            self.count = keep
+
+        new = slice(self.count, self.count + n)
+        rng = self.rng
+        self.x[new] = x
+        self.y[new] = y
+        self.vx[new] = rng.uniform(-1, -0.5, n)
+        self.vy[new] = rng.uniform(-1, 1, n)
+        self.lifetime[new] = rng.integers(20, PARTICLE_MAX_LIFETIME, n, endpoint=True)
+        self.size[new] = rng.integers(3, PARTICLE_MAX_SIZE, n, endpoint=True)
+        self.color[new] = rng.integers(0, len(PARTICLE_COLORS), n)
+        self.count += n
 
     def update(self):
-        self.x += self.vx
-        self.y += self.vy
-        self.lifetime -= 1
-        self.size = max(1, self.size - 0.1)
+        n = self.count
+        if n == 0:
+            return
+        self.version += 1
+        self.x[:n] += self.vx[:n]
+        self.y[:n] += self.vy[:n]
+        self.lifetime[:n] -= 1
+        np.maximum(self.size[:n] - 0.1, 1, out=self.size[:n])
+
+        # Compact the survivors to the front of the pool
+        alive = self.lifetime[:n] > 0
+        survivors = int(np.count_nonzero(alive))
+        if survivors < n:
+            for field in self.fields:
+                field[:survivors] = field[:n][alive]
+            self.count = survivors
 
     def draw(self):
-        if self.lifetime > 0:
-            alpha = int(255 * (self.lifetime / 40))
-            pygame.draw.circle(screen, self.color, (int(self.x), int(self.y)), int(self.size))
-
-    def is_alive(self):
-        return self.lifetime > 0
+        n = self.count
+        if n == 0:
+            return
+        if self.sprites is None:
+            self.sprites = self.render_sprites()
+
+        radius = self.size[:n].astype(np.intp)
+        level = self.lifetime[:n] * PARTICLE_ALPHA_LEVELS // (PARTICLE_MAX_LIFETIME + 1)
+        index = (self.color[:n] * (PARTICLE_MAX_SIZE + 1) + radius) * PARTICLE_ALPHA_LEVELS + level
+        left = (self.x[:n] - radius).astype(np.intp).tolist()
+        top = (self.y[:n] - radius).astype(np.intp).tolist()
+        sprites = self.sprites
+        screen.blits([(sprites[i], (l, t)) for i, l, t in zip(index.tolist(), left, top)], False)
+
+    def bounds(self):
+        n = self.count
+        if n == 0:
+            return (0, 0, 0, 0)
+        left = int(self.x[:n].min()) - PARTICLE_MAX_SIZE
+        top = int(self.y[:n].min()) - PARTICLE_MAX_SIZE
+        right = int(self.x[:n].max()) + PARTICLE_MAX_SIZE + 1
+        bottom = int(self.y[:n].max()) + PARTICLE_MAX_SIZE + 1
+        return (left, top, right - left, bottom - top)
+
+    @staticmethod
+    def render_sprites():
+        # Flat table indexed by (color, radius, alpha level)
+        sprites = []
+        for color in PARTICLE_COLORS:
+            for radius in range(PARTICLE_MAX_SIZE + 1):
+                for level in range(PARTICLE_ALPHA_LEVELS):
+                    surface = pygame.Surface((2 * radius + 1, 2 * radius + 1), pygame.SRCALPHA)
+                    alpha = 255 * (level + 1) // PARTICLE_ALPHA_LEVELS
+                    pygame.draw.circle(surface, color + (alpha,), (radius, radius), radius)
+                    sprites.append(surface.convert_alpha())
+        return sprites
 
 class Cloud:
-    def __init__(self):
-        self.x = WIDTH + random.randint(0, 300)
+    def __init__(self, strip_width):
+        self.x = random.randint(0, strip_width)
         self.y = random.randint(50, 200)
-        self.speed = random.uniform(0.5, 1.5)
         self.size = random.randint(30, 60)
 
-    def update(self):
-        self.x -= self.speed
-        if self.x < -100:
-            self.x = WIDTH + 50
-            self.y = random.randint(50, 200)
+    def bounds(self):
+        # The three puffs reach from x - size to x + 2.4 * size
+        return pygame.Rect(self.x - self.size, self.y - self.size, int(self.size * 3.4) + 2, 2 * self.size + 1)
 
-    def draw(self):
-        pygame.draw.circle(screen, (250, 250, 250), (self.x, self.y), self.size)
-        pygame.draw.circle(screen, (250, 250, 250), (self.x + self.size*0.8, self.y - self.size*0.2), self.size*0.7)
-        pygame.draw.circle(screen, (250, 250, 250), (self.x + self.size*1.5, self.y), self.size*0.9)
+    def draw(self, surface, x):
+        pygame.draw.circle(surface, CLOUD_WHITE, (x, self.y), self.size)
+        pygame.draw.circle(surface, CLOUD_WHITE, (x + self.size*0.8, self.y - self.size*0.2), self.size*0.7)
+        pygame.draw.circle(surface, CLOUD_WHITE, (x + self.size*1.5, self.y), self.size*0.9)
+
+class Layer:
+    """Pre-composited strip that wraps around horizontally and scrolls at its own speed."""
+    def __init__(self, surface, y=0, speed=0, items=()):
+        self.surface = surface
+        self.width = surface.get_width()
+        self.y = y
+        self.speed = speed
+        self.offset = 0
+        self.prev_offset = 0
+        self.items = list(items)  # bounds of the details baked into the strip
+
+    def update(self):
+        self.prev_offset = self.offset
+        self.offset = (self.offset + self.speed) % self.width
+
+    def hold(self):
+        """Stay put for this tick, so interpolation does not replay the last move."""
+        self.prev_offset = self.offset
+
+    def draw_x(self, alpha):
+        moved = (self.offset - self.prev_offset) % self.width
+        return -int((self.prev_offset + moved * alpha) % self.width)
+
+    def draw(self, alpha=1.0):
+        x = self.draw_x(alpha)
+        screen.blit(self.surface, (x, self.y))
+        if x + self.width < WIDTH:
+            screen.blit(self.surface, (x + self.width, self.y))
+
+    def item_rects(self, alpha=1.0):
+        """Screen bounds of the baked-in items at the drawn offset, one per wrap-around tile."""
+        x = self.draw_x(alpha)
+        for rect in self.items:
+            for tile_x in (x - self.width, x, x + self.width):
+                yield rect.move(tile_x, self.y)
+
+def build_sky_layer():
+    surface = pygame.Surface((WIDTH, HEIGHT - GROUND_HEIGHT)).convert()
+    surface.fill(SKY_BLUE)
 
-def draw_ground():
-    pygame.draw.rect(screen, GROUND_COLOR, (0, HEIGHT - GROUND_HEIGHT, WIDTH, GROUND_HEIGHT))
+    # Draw sun
+    pygame.draw.circle(surface, (255, 255, 200), (700, 80), 60)
+    pygame.draw.circle(surface, (255, 255, 100), (700, 80), 40)
+    return Layer(surface)
+
+def build_cloud_layer(count, speed):
+    strip_width = 2 * WIDTH
+    surface = make_sprite(strip_width, CLOUD_STRIP_HEIGHT)
+    items = []
+    for _ in range(count):
+        cloud = Cloud(strip_width)
+        # Paint every cloud once per neighbouring tile so the strip wraps seamlessly
+        for x in (cloud.x - strip_width, cloud.x, cloud.x + strip_width):
+            cloud.draw(surface, x)
+        items.append(cloud.bounds())
+    return Layer(surface, speed=speed, items=items)
+
+def build_ground_layer():
+    # Strip width is a whole number of ground-detail periods so it tiles
+    width = -(-WIDTH // GROUND_DETAIL_SPACING) * GROUND_DETAIL_SPACING
+    surface = pygame.Surface((width, GROUND_HEIGHT)).convert()
+    surface.fill(GROUND_COLOR)
 
     # Draw grass
-    pygame.draw.rect(screen, (34, 139, 34), (0, HEIGHT - GROUND_HEIGHT, WIDTH, 20))
+    pygame.draw.rect(surface, (34, 139, 34), (0, 0, width, 20))
 
     # Draw ground details
-    for i in range(0, WIDTH, 30):
-        pygame.draw.line(screen, (80, 50, 20), (i, HEIGHT - GROUND_HEIGHT + 10),
-                         (i + 15, HEIGHT - GROUND_HEIGHT + 10), 2)
+    for i in range(0, width, GROUND_DETAIL_SPACING):
+        pygame.draw.line(surface, (80, 50, 20), (i, 10), (i + 15, 10), 2)
+    return Layer(surface, y=HEIGHT - GROUND_HEIGHT, speed=PIPE_SPEED)
 
-def draw_background():
-    # Sky
-    screen.fill(SKY_BLUE)
+def build_layers():
+    global background_layers, ground_layer
 
-    # Draw sun
-    pygame.draw.circle(screen, (255, 255, 200), (700, 80), 60)
-    pygame.draw.circle(screen, (255, 255, 100), (700, 80), 40)
+    background_layers = [build_sky_layer()]
+    for count, speed in CLOUD_LAYERS:
+        background_layers.append(build_cloud_layer(count, speed))
+    ground_layer = build_ground_layer()
+
+def draw_ground(alpha=1.0):
+    ground_layer.draw(alpha)
+
+def visible_layers():
+    """The sky and, nearest first, as many cloud layers as the quality level draws."""
+    return background_layers[:1] + background_layers[len(background_layers) - cloud_layers:]
 
-    # Draw clouds
-    for cloud in clouds:
-        cloud.draw()
+def draw_background(alpha=1.0):
+    for layer in visible_layers():
+        layer.draw(alpha)
 
 def draw_score(score, high_score):
-    score_text = font_medium.render(f"Score: {score}", True, TEXT_COLOR)
-    screen.blit(score_text, (20, 20))
+    score_text.draw(screen, score, (20, 20))
+    high_score_text.draw(screen, high_score, (20, 70))
 
-    high_score_text = font_medium.render(f"High Score: {high_score}", True, TEXT_COLOR)
-    screen.blit(high_score_text, (20, 70))
+def dim_overlay(alpha):
+    """A translucent black sheet over the whole screen, built once per alpha."""
+    overlay = overlays.get(alpha)
+    if overlay is None:
+        overlay = overlays[alpha] = pygame.Surface((WIDTH, HEIGHT), pygame.SRCALPHA)
+        overlay.fill((0, 0, 0, alpha))
+    return overlay
 
 def draw_game_over(score, high_score, restart_button):
-    overlay = pygame.Surface((WIDTH, HEIGHT), pygame.SRCALPHA)
-    overlay.fill((0, 0, 0, 180))
-    screen.blit(overlay, (0, 0))
+    screen.blit(dim_overlay(180), (0, 0))
 
-    game_over_text = font_large.render("GAME OVER", True, RED)
+    game_over_text = text_cache.render(font_large, "GAME OVER", RED, text_antialias)
     screen.blit(game_over_text, (WIDTH//2 - game_over_text.get_width()//2, HEIGHT//3))
 
-    score_text = font_medium.render(f"Score: {score}", True, TEXT_COLOR)
-    screen.blit(score_text, (WIDTH//2 - score_text.get_width()//2, HEIGHT//2))
-
-    high_score_text = font_medium.render(f"High Score: {high_score}", True, TEXT_COLOR)
-    screen.blit(high_score_text, (WIDTH//2 - high_score_text.get_width()//2, HEIGHT//2 + 50))
+    score_text.draw_centered(screen, score, WIDTH//2, HEIGHT//2)
+    high_score_text.draw_centered(screen, high_score, WIDTH//2, HEIGHT//2 + 50)
 
     # Draw restart button
     restart_button.draw()
 
 def draw_start_screen():
-    title_text = font_large.render("RARA AVIS", True, (255, 215, 0))
+    title_text = text_cache.render(font_large, "RARA AVIS", (255, 215, 0), text_antialias)
     screen.blit(title_text, (WIDTH//2 - title_text.get_width()//2, HEIGHT//4))
 
     instructions = [
@@ -266,7 +531,7 @@ def draw_start_screen():
     ]
 
     for i, line in enumerate(instructions):
-        text = font_small.render(line, True, TEXT_COLOR)
+        text = text_cache.render(font_small, line, TEXT_COLOR, text_antialias)
         screen.blit(text, (WIDTH//2 - text.get_width()//2, HEIGHT//2 + i*40))
 
     # Draw a simple bird in the start screen
@@ -279,156 +544,412 @@ def draw_start_screen():
     ])
 
 def draw_paused():
-    overlay = pygame.Surface((WIDTH, HEIGHT), pygame.SRCALPHA)
-    overlay.fill((0, 0, 0, 128))
-    screen.blit(overlay, (0, 0))
+    screen.blit(dim_overlay(128), (0, 0))
 
-    paused_text = font_large.render("PAUSED", True, TEXT_COLOR)
+    paused_text = text_cache.render(font_large, "PAUSED", TEXT_COLOR, text_antialias)
     screen.blit(paused_text, (WIDTH//2 - paused_text.get_width()//2, HEIGHT//2 - 50))
 
-    resume_text = font_small.render("Press P to resume", True, TEXT_COLOR)
+    resume_text = text_cache.render(font_small, "Press P to resume", TEXT_COLOR, text_antialias)
     screen.blit(resume_text, (WIDTH//2 - resume_text.get_width()//2, HEIGHT//2 + 20))
 
-def main():
-    global clouds
-
-    clock = pygame.time.Clock()
-    bird = Bird()
-    pipes = []
-    particles = []
-    score = 0
-    high_score = 0
-    last_pipe = pygame.time.get_ticks()
-    game_state = "start"  # start, playing, paused, game_over
-    clouds = [Cloud() for _ in range(5)]
-    paused = False
-
-    # Create buttons
-    restart_button = Button(WIDTH//2 - 100, HEIGHT//2 + 100, 200, 50, "RESTART")
-
-    # Main game loop
-    while True:
-        current_time = pygame.time.get_ticks()
-        mouse_pos = pygame.mouse.get_pos()
-
-        # Event handling
-        for event in pygame.event.get():
-            if event.type == pygame.QUIT:
-                pygame.quit()
-                sys.exit()
-
-            if game_state == "start":
-                if event.type == pygame.KEYDOWN:
-                    if event.key == pygame.K_RETURN or event.key == pygame.K_SPACE:
-                        game_state = "playing"
-
-            elif game_state == "playing":
-                if event.type == pygame.KEYDOWN:
-                    if event.key == pygame.K_SPACE:
-                        bird.flap()
-                    if event.key == pygame.K_p:
-                        paused = True
-                        game_state = "paused"
-                if event.type == pygame.MOUSEBUTTONDOWN:
-                    bird.flap()
-
-            elif game_state == "paused":
-                if event.type == pygame.KEYDOWN:
-                    if event.key == pygame.K_p:
-                        paused = False
-                        game_state = "playing"
-
-            elif game_state == "game_over":
-                restart_button.check_hover(mouse_pos)
-                restart_pressed = restart_button.check_click(mouse_pos, event)
-                if event.type == pygame.KEYDOWN and event.key == pygame.K_SPACE:
-                    restart_pressed = True
-                if restart_pressed:
-                    # Reset game
-                    bird = Bird()
-                    pipes = []
-                    particles = []
-                    score = 0
-                    last_pipe = current_time
-                    game_state = "playing"
-
+class Game:
+    """One Rara Avis session: the simulation, its effects and the menu state machine."""
+    def __init__(self, seed=None):
+        self.seed = seed
+        self.sim = Simulation(seed)
+        self.particles = ParticleSystem(seed)
+        self.high_score = 0
+        self.games = 1
+        self.state = "start"  # start, playing, paused, game_over
+        self.flap = False  # flap requested since the last tick
+        self.ticks = 0  # simulation ticks since the session started
+        self.recorder = None  # ReplayWriter while recording
+
+        # Create buttons
+        self.restart_button = Button(WIDTH//2 - 100, HEIGHT//2 + 100, 200, 50, "RESTART")
+
+    def handle_event(self, event, mouse_pos):
+        if self.state == "start":
+            if event.type == pygame.KEYDOWN:
+                if event.key == pygame.K_RETURN or event.key == pygame.K_SPACE:
+                    self.act(START)
+
+        elif self.state == "playing":
+            if event.type == pygame.KEYDOWN:
+                if event.key == pygame.K_SPACE:
+                    self.act(FLAP)
+                if event.key == pygame.K_p:
+                    self.act(PAUSE)
+            if event.type == pygame.MOUSEBUTTONDOWN:
+                self.act(FLAP)
+
+        elif self.state == "paused":
+            if event.type == pygame.KEYDOWN:
+                if event.key == pygame.K_p:
+                    self.act(RESUME)
+
+        elif self.state == "game_over":
+            self.restart_button.check_hover(mouse_pos)
+            restart_pressed = self.restart_button.check_click(mouse_pos, event)
+            if event.type == pygame.KEYDOWN and event.key == pygame.K_SPACE:
+                restart_pressed = True
+            if restart_pressed:
+                self.act(RESTART)
+
+    def act(self, action):
+        """Apply a game action before the next tick (and record it for replays)."""
+        if self.recorder:
+            self.recorder.record(self.ticks, action)
+        if action == START or action == RESUME:
+            self.state = "playing"
+        elif action == FLAP:
+            self.flap = True
+        elif action == PAUSE:
+            self.state = "paused"
+        elif action == RESTART:
+            # Reset game; a seeded session gives every game its own seed
+            self.sim.reset(None if self.seed is None else self.seed + self.games)
+            self.games += 1
+            self.particles.clear()
+            self.flap = False
+            self.state = "playing"
+
+    def keyframe(self):
+        """Session state for replay keyframes; particles and clouds are cosmetic and left out."""
+        return {"ticks": self.ticks, "state": self.state, "games": self.games, "high_score": self.high_score,
+                "flap": self.flap, "seed": self.sim.seed, "sim": self.sim.snapshot()}
+
+    def load_keyframe(self, keyframe):
+        self.ticks = keyframe["ticks"]
+        self.state = keyframe["state"]
+        self.games = keyframe["games"]
+        self.high_score = keyframe["high_score"]
+        self.flap = keyframe["flap"]
+        self.sim.seed = keyframe["seed"]
+        bird, pipes, score, frame, last_pipe_frame, (version, internal, gauss) = keyframe["sim"]
+        self.sim.restore((bird, pipes, score, frame, last_pipe_frame, (version, tuple(internal), gauss)))
+        self.particles.clear()
+
+    def tick(self):
+        """Advance one fixed simulation tick."""
         # Update game objects
-        if game_state == "playing":
-            bird.update()
+        if self.state == "playing":
+            sim = self.sim
+            _state, _reward, done = sim.step(self.flap)
+            self.flap = False
+            bird = sim.bird
 
-            # Spawn particles behind the bird
-            if random.random() < 0.5:  # 50% chance each frame
-                particles.append(Particle(bird.x, bird.y + BIRD_HEIGHT // 2))
-
-            # Update particles
-            for particle in particles[:]:
-                particle.update()
-                if not particle.is_alive():
-                    particles.remove(particle)
-
-            # Generate new pipes
-            if current_time - last_pipe > PIPE_FREQUENCY:
-                pipes.append(Pipe())
-                last_pipe = current_time
-
-            # Update pipes
-            for pipe in pipes[:]:
-                pipe.update()
-
-                # Check if bird passed the pipe
-                if not pipe.passed and pipe.x + PIPE_WIDTH < bird.x:
-                    pipe.passed = True
-                    score += 1
-
-                # Check for collisions
-                if pipe.collide(bird):
-                    bird.alive = False
-
-                # Remove pipes that are off screen
-                if pipe.x + PIPE_WIDTH < 0:
-                    pipes.remove(pipe)
+            # Spawn particles behind the bird and update them
+            self.particles.emit(bird.x, bird.y + BIRD_HEIGHT // 2, particle_rate)
+            self.particles.update()
 
             # Check if bird is dead
-            if not bird.alive:
-                game_state = "game_over"
-                if score > high_score:
-                    high_score = score
-
-        # Update clouds
-        for cloud in clouds:
-            cloud.update()
+            if done:
+                self.state = "game_over"
+                if sim.score > self.high_score:
+                    self.high_score = sim.score
+
+        # Scroll the background; the ground only moves with the pipes
+        for layer in background_layers:
+            layer.update()
+        if self.state == "playing":
+            ground_layer.update()
+        else:
+            ground_layer.hold()
+
+        self.ticks += 1
+        if self.recorder and self.ticks % self.recorder.keyframe_interval == 0:
+            self.recorder.keyframe(self.ticks, self.keyframe())
+
+    def static_view(self):
+        """What a static screen (start, paused, game over) shows, or None while playing.
+
+        Nothing on these screens moves but the clouds, so two frames with the
+        same view differ only by a cloud step and idle mode need not redraw.
+        """
+        if self.state == "playing":
+            return None
+        return (self.state, self.restart_button.hovered)
+
+    def sim_alpha(self, alpha):
+        # The game world only moves while playing, so only then interpolate it
+        return alpha if self.state == "playing" else 1.0
+
+    def draw(self, alpha=1.0):
+        """Draw a frame interpolated ``alpha`` of the way from the previous tick to the last one."""
+        sim = self.sim
+        sim_alpha = self.sim_alpha(alpha)
 
         # Drawing
-        draw_background()
+        draw_background(alpha)
 
         # Draw particles (behind bird)
-        for particle in particles:
-            particle.draw()
+        self.particles.draw()
 
         # Draw pipes
-        for pipe in pipes:
-            pipe.draw()
+        for pipe in sim.pipes:
+            pipe.draw(sim_alpha)
 
         # Draw ground
-        draw_ground()
+        draw_ground(sim_alpha)
 
         # Draw bird
-        bird.draw()
+        sim.bird.draw(sim_alpha)
 
         # Draw score
-        if game_state == "playing" or game_state == "game_over" or game_state == "paused":
-            draw_score(score, high_score)
+        if self.state == "playing" or self.state == "game_over" or self.state == "paused":
+            draw_score(sim.score, self.high_score)
 
         # Draw screens
-        if game_state == "start":
+        if self.state == "start":
             draw_start_screen()
-        elif game_state == "paused":
+        elif self.state == "paused":
             draw_paused()
-        elif game_state == "game_over":
-            draw_game_over(score, high_score, restart_button)
+        elif self.state == "game_over":
+            draw_game_over(sim.score, self.high_score, self.restart_button)
+
+    def track_dirty(self, dirty, alpha):
+        """Record where every moving or changing element is drawn this frame."""
+        sim = self.sim
+        sim_alpha = self.sim_alpha(alpha)
+        bird = sim.bird
+        dirty.track("bird", (bird.x, lerp(bird.prev_y, bird.y, sim_alpha), BIRD_WIDTH + 11, BIRD_HEIGHT),
+                    bird.wing_angle)
+        for pipe in sim.pipes:
+            dirty.track(("pipe", id(pipe)),
+                        (lerp(pipe.prev_x, pipe.x, sim_alpha) - 5, 0, PIPE_WIDTH + 10, HEIGHT - GROUND_HEIGHT))
+        dirty.track("particles", self.particles.bounds(), self.particles.version)
+        for index, layer in enumerate(visible_layers()):
+            for item, rect in enumerate(layer.item_rects(alpha)):
+                dirty.track(("layer", index, item), rect)
+        dirty.track("ground", (0, HEIGHT - GROUND_HEIGHT, WIDTH, GROUND_HEIGHT), ground_layer.draw_x(sim_alpha))
+        if self.state != "start":
+            dirty.track("score", score_text.rect(sim.score, (20, 20)), sim.score)
+            dirty.track("high_score", high_score_text.rect(self.high_score, (20, 70)), self.high_score)
+        if self.state == "game_over":
+            dirty.track("restart", self.restart_button.rect, self.restart_button.hovered)
+
+def main(argv=None, input_script=None):
+    """Run the game. ``input_script(frame)``, if given, returns events to inject before each frame."""
+    parser = argparse.ArgumentParser(description="Rara Avis - Flappy Bird Clone")
+    parser.add_argument("--dirty-rects", action="store_true",
+                        help="present only the regions that changed each frame")
+    parser.add_argument("--max-fps", type=int, default=FPS,
+                        help="render frame rate cap, 0 for uncapped (the simulation always ticks at %d Hz)" % FPS)
+    parser.add_argument("--lockstep", action="store_true",
+                        help="run exactly one simulation tick per rendered frame (deterministic runs)")
+    parser.add_argument("--frames", type=int, help="quit after this many frames")
+    parser.add_argument("--seed", type=int, help="seed the pipes and all cosmetic randomness")
+    parser.add_argument("--profile-out", metavar="PATH",
+                        help="write per-frame phase timings to PATH (.csv or .json) on exit")
+    parser.add_argument("--startup-profile", action="store_true",
+                        help="print how long each startup step took, up to the first frame")
+    parser.add_argument("--record", metavar="PATH", help="record the session's inputs to a replay file")
+    parser.add_argument("--replay", metavar="PATH", help="play back a replay file instead of taking input")
+    parser.add_argument("--seek", type=int, default=0, metavar="TICK", help="start the replay at this tick")
+    parser.add_argument("--capture", metavar="PATH",
+                        help="record the frames shown to a PNG sequence (frames/%%05d.png), raw RGB (.rgb) "
+                             "or, through ffmpeg, a video file; frames the writer cannot keep up with are dropped")
+    parser.add_argument("--quality", default="0", metavar="LEVEL",
+                        choices=["auto"] + [str(level) for level in range(len(QUALITY_LEVELS))],
+                        help="effects quality from 0 (full, the default) to %d (cheapest), or auto to drop "
+                             "effects while frames run long and restore them when there is headroom"
+                             % (len(QUALITY_LEVELS) - 1))
+    parser.add_argument("--window", type=parse_size, metavar="WxH",
+                        help="window size; the game still draws at %dx%d and is scaled to fit" % (WIDTH, HEIGHT))
+    parser.add_argument("--fullscreen", action="store_true", help="fill the screen, scaled the same way")
+    parser.add_argument("--scaler", choices=SCALERS, default="sdl",
+                        help="how --fullscreen scales each frame: sdl (the SCALED display flag, on the GPU "
+                             "where available) or software (pygame.transform.scale); --window always uses software")
+    parser.add_argument("--idle", action="store_true",
+                        help="on the start, paused and game over screens draw once and sleep until input "
+                             "changes something, instead of redrawing every frame (the clouds stop meanwhile)")
+    parser.add_argument("--gc-idle", action="store_true",
+                        help="freeze the startup heap and run garbage collections only in the idle time "
+                             "before each frame's deadline")
+    parser.add_argument("--gc-report", action="store_true",
+                        help="print garbage collection pauses on exit, split into idle time and the frame path")
+    parser.add_argument("--trace-allocs", type=int, metavar="FRAMES",
+                        help="snapshot tracemalloc every FRAMES frames and print the top allocation sites "
+                             "per frame on exit (slows the game down)")
+    args = parser.parse_args(argv)
+
+    replay = Replay.load(args.replay) if args.replay else None
+    if replay and replay.game != "rara":
+        parser.error("%s is a %s replay" % (args.replay, replay.game))
+    if replay and args.record:
+        parser.error("--record and --replay cannot be combined")
+    seed = replay.seed if replay else args.seed
+    if args.record and seed is None:
+        seed = random.randrange(2**31)  # a replay needs a seed to reproduce the pipes
+
+    startup = StartupProfile(STARTUP_BEGIN)
+    startup.mark("imports")
+    if seed is not None:
+        random.seed(seed)
+    init_display(window_size=args.window, fullscreen=args.fullscreen, scaler=args.scaler)
+    startup.mark("display, fonts")
+    clock = pygame.time.Clock()
+    build_layers()
+    game = Game(seed)
+    player = seek(replay, game, args.seek) if replay else None
+    if args.record:
+        game.recorder = ReplayWriter(args.record, "rara", seed)
+    startup.mark("assets")
+
+    dirty = DirtyRects((WIDTH, HEIGHT), display=display or pygame.display) if args.dirty_rects else None
+    drawn_state = None
+
+    # The simulation advances in fixed ticks; frames render as fast as --max-fps allows
+    timestep = FixedTimestep(FPS, lockstep=args.lockstep)
+
+    capture = None
+    if args.capture:
+        try:
+            capture = FrameCapture(args.capture, screen, fps=args.max_fps or FPS)
+        except (RuntimeError, OSError, ValueError) as error:
+            parser.error(str(error))
+
+    # Garbage collector pacing (starts after the first frame) and allocation sampling
+    pacer = GCPacer(idle=args.gc_idle) if args.gc_idle or args.gc_report else None
+    allocations = AllocationSampler(args.trace_allocs) if args.trace_allocs else None
+
+    # Frame-phase timings; F3 toggles the overlay
+    profiler = FrameProfiler(["events", "update", "draw", "flip", "tick"])
+    profiler_overlay = ProfilerOverlay(profiler, font_small, pos=(WIDTH - 300, 10))
+
+    # Effects quality; auto steps through QUALITY_LEVELS against the frame budget
+    governor = None
+    if args.quality == "auto":
+        governor = QualityGovernor(1 / (args.max_fps or FPS), len(QUALITY_LEVELS))
+        apply_quality(0)
+    else:
+        apply_quality(int(args.quality))
+    profiler.set_counter("quality", 0 if governor else int(args.quality))
+
+    # Idle mode sleeps on static screens; scripted and replayed runs need every frame
+    idle = args.idle and not input_script and not player
+    idle_view = None  # the static screen on display while idling
+    pending = []  # the event that ended the sleep
+
+    # Main game loop
+    running = True
+    while running and (args.frames is None or profiler.frame < args.frames):
+        if idle_view is not None:
+            # Nothing on screen changes without input: block until some arrives
+            pending.append(pygame.event.wait())
+            timestep.resume()
+        profiler.begin_frame()
+        sprites.validate()
+        mouse_pos = pygame.mouse.get_pos()
+        if display:
+            mouse_pos = display.to_logical(mouse_pos)
+        if input_script:
+            for event in input_script(profiler.frame):
+                pygame.event.post(event)
 
-        pygame.display.flip()
-        clock.tick(FPS)
+        # Event handling
+        exposed = False
+        for event in chain(pending, pygame.event.get()):
+            if event.type == pygame.QUIT:
+                running = False
+            if event.type in REDRAW_EVENTS:
+                exposed = True
+
+            if event.type == pygame.KEYDOWN and event.key == pygame.K_F3:
+                profiler_overlay.toggle()
+
+            if not player:
+                game.handle_event(event, mouse_pos)
+
+        pending.clear()
+        profiler.mark("events")
+
+        if idle_view is not None and not exposed and (game.static_view(), profiler_overlay.visible) == idle_view:
+            profiler.end_frame()
+            continue  # the input changed nothing on screen, e.g. the mouse moved but not onto the button
+
+        for _ in range(timestep.advance()):
+            if player:
+                player.apply(game)
+            game.tick()
+
+        profiler.mark("update")
+
+        # Interpolate between the last two ticks
+        alpha = timestep.alpha
+        game.draw(alpha)
+        profiler_overlay.draw(screen)
+        profiler.mark("draw")
+
+        if dirty:
+            # Overlays cover the whole screen, so a state change is a full frame
+            if game.state != drawn_state or exposed:
+                dirty.invalidate()
+                drawn_state = game.state
+            game.track_dirty(dirty, alpha)
+            if profiler_overlay.visible:
+                dirty.track("profiler", profiler_overlay.rect(), profiler_overlay.version)
+            dirty.present()
+        elif display:
+            display.flip()
+        else:
+            pygame.display.flip()
+        if capture:
+            # Copy the frame for the background writer
+            capture.grab(screen)
+            profiler.set_counter("capture drops", capture.dropped)
+        profiler.mark("flip")
+        if profiler.frame == 0:
+            startup.mark("first frame")
+            if args.startup_profile:
+                startup.report()
+            if pacer:
+                pacer.start()
+        if governor and profiler.frame > 0:
+            # Working time so far, i.e. everything but the wait in clock.tick; the
+            # first frame builds sprites and is left out
+            level = governor.update(time.perf_counter() - profiler.frame_start)
+            if level is not None:
+                apply_quality(level)
+                profiler.set_counter("quality", level)
+                profiler.set_counter("quality changes", len(governor.transitions))
+                profiler.set_counter("last quality change", "%d -> %d at frame %d" % (
+                    governor.transitions[-1][1], level, profiler.frame))
+                if dirty:
+                    dirty.invalidate()
+        if pacer:
+            # Collect in whatever is left of this frame's budget
+            pacer.collect_idle(profiler.frame_start, 1 / args.max_fps if args.max_fps else 0)
+            profiler.set_counter("gc pauses > 2 ms", pacer.frame_path_pauses()[1])
+        if allocations:
+            allocations.end_frame(profiler.frame)
+        clock.tick(args.max_fps)
+        profiler.mark("tick")
+        profiler.end_frame()
+
+        view = game.static_view()
+        idle_view = (view, profiler_overlay.visible) if idle and view is not None else None
+
+        if player and game.ticks >= replay.ticks:
+            player.apply(game)  # actions taken after the last tick, e.g. just before quitting
+            running = False
+
+    if capture:
+        frames, dropped = capture.close()
+        print("Captured %d frames to %s (%d dropped)" % (frames, args.capture, dropped))
+    if game.recorder:
+        game.recorder.close(game.ticks, game.keyframe())
+    if pacer:
+        if args.gc_report:
+            print(pacer.report())
+        pacer.close()
+    if allocations:
+        print(allocations.report())
+        allocations.close()
+    if args.profile_out:
+        profiler.dump(args.profile_out)
+    pygame.quit()
 
 if __name__ == "__main__":
     main()
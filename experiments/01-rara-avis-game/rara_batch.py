@@ -0,0 +1,194 @@
+"""NumPy-vectorized batch of independent Rara Avis games.
+
+``BatchSimulation`` keeps the bird and pipe state of N games in flat arrays
+and advances all of them with one vectorized ``step``, using the same
+constants and rules as ``rara_sim.Simulation``. It is meant for scoring
+policies over thousands of games per process; the wing animation and other
+cosmetic state are not simulated.
+
+Usage:
+    batch = BatchSimulation(10000, seed=0)
+    obs, rewards, dones = batch.step(obs[:, 1] > 0)
+"""
+import time
+
+import numpy as np
+
+from rara_sim import (WIDTH, HEIGHT, GRAVITY, FLAP_STRENGTH, PIPE_SPEED, PIPE_GAP,
+                      PIPE_FREQUENCY_FRAMES, GROUND_HEIGHT, BIRD_HEIGHT,
+                      PIPE_WIDTH, PIPE_MIN_HEIGHT, PIPE_MAX_HEIGHT, BIRD_SPRITE_WIDTH,
+                      PIPE_DX_MIN, PIPE_ROWS)
+
+BIRD_X = WIDTH // 3
+BIRD_FLOOR = HEIGHT - GROUND_HEIGHT - BIRD_HEIGHT
+
+# A pipe lives for (WIDTH + PIPE_WIDTH) / PIPE_SPEED frames and a new one
+# spawns every PIPE_FREQUENCY_FRAMES + 1 frames, so this many slots per game
+# are enough for a ring buffer that never overwrites a live pipe.
+MAX_PIPES = (WIDTH + PIPE_WIDTH) // PIPE_SPEED // (PIPE_FREQUENCY_FRAMES + 1) + 2
+
+OBS_SIZE = 5  # bird_y, velocity, pipe_dx, gap_top, gap_bottom
+
+# rara_sim.PIPE_ROWS as lookup arrays: the first and last + 1 bird rows under a pipe
+PIPE_FIRST_ROW, PIPE_LAST_ROW = np.array(PIPE_ROWS, dtype=np.int32).T
+
+
+class BatchSimulation:
+    """N Rara Avis games stepped in lockstep.
+
+    Games that die stay frozen (and keep reporting ``done``) until they are
+    reset with ``reset(mask)``.
+    """
+
+    def __init__(self, n, seed=None):
+        self.n = n
+        self.rng = np.random.default_rng(seed)
+
+        self.bird_y = np.empty(n, dtype=np.float64)
+        self.velocity = np.empty(n, dtype=np.float64)
+        self.alive = np.empty(n, dtype=bool)
+        self.flap_count = np.empty(n, dtype=np.int32)
+        self.score = np.empty(n, dtype=np.int32)
+        self.frame = np.empty(n, dtype=np.int32)
+        self.last_pipe_frame = np.empty(n, dtype=np.int32)
+        self.pipes_spawned = np.empty(n, dtype=np.int32)
+
+        self.pipe_x = np.empty((n, MAX_PIPES), dtype=np.int32)
+        self.pipe_height = np.empty((n, MAX_PIPES), dtype=np.int32)
+        self.pipe_active = np.empty((n, MAX_PIPES), dtype=bool)
+        self.pipe_passed = np.empty((n, MAX_PIPES), dtype=bool)
+
+        # Returned by step()/observe() and overwritten in place on every call
+        self.obs = np.empty((n, OBS_SIZE), dtype=np.float64)
+        self.rewards = np.empty(n, dtype=np.int32)
+
+        self.reset()
+
+    def reset(self, mask=None):
+        """Reset every game, or only those where ``mask`` is True."""
+        if mask is None:
+            mask = slice(None)
+        self.bird_y[mask] = HEIGHT // 2
+        self.velocity[mask] = 0
+        self.alive[mask] = True
+        self.flap_count[mask] = 0
+        self.score[mask] = 0
+        self.frame[mask] = 0
+        self.last_pipe_frame[mask] = 0
+        self.pipes_spawned[mask] = 0
+        self.pipe_active[mask] = False
+        self.pipe_passed[mask] = False
+        return self.observe()
+
+    def step(self, actions):
+        """Advance every live game one frame. ``actions`` is a bool array (True = flap).
+
+        Returns ``(obs, rewards, dones)``; ``obs`` and ``rewards`` are reused
+        buffers, copy them if they must outlive the next call.
+        """
+        alive = self.alive
+        velocity = self.velocity
+        bird_y = self.bird_y
+
+        # Flap, then apply gravity
+        flap = np.logical_and(actions, alive)
+        velocity[flap] = FLAP_STRENGTH
+        self.flap_count += flap
+        velocity += GRAVITY * alive
+        bird_y += velocity * alive
+
+        # Ground kills, ceiling clamps
+        grounded = bird_y >= BIRD_FLOOR
+        bird_y[grounded] = BIRD_FLOOR
+        alive &= ~grounded
+        ceiling = bird_y <= 0
+        bird_y[ceiling] = 0
+        velocity[ceiling] = 0
+
+        # Birds that hit the ground this frame still finish the frame, as in
+        # Simulation.step, so use the pre-ground mask for the rest of it
+        moving = alive | grounded
+        self.frame += moving
+
+        # Generate new pipes into each game's ring of slots
+        spawn = moving & (self.frame - self.last_pipe_frame > PIPE_FREQUENCY_FRAMES)
+        games = np.flatnonzero(spawn)
+        if games.size:
+            slots = self.pipes_spawned[games] % MAX_PIPES
+            self.pipe_x[games, slots] = WIDTH
+            self.pipe_height[games, slots] = self.rng.integers(
+                PIPE_MIN_HEIGHT, PIPE_MAX_HEIGHT + 1, size=games.size)
+            self.pipe_active[games, slots] = True
+            self.pipe_passed[games, slots] = False
+            self.last_pipe_frame[games] = self.frame[games]
+            self.pipes_spawned[games] += 1
+
+        # Move pipes
+        active = self.pipe_active & moving[:, None]
+        self.pipe_x -= PIPE_SPEED * active
+        pipe_x = self.pipe_x
+        pipe_height = self.pipe_height
+
+        # Score pipes the bird has passed
+        passed = active & ~self.pipe_passed & (pipe_x + PIPE_WIDTH < BIRD_X)
+        self.pipe_passed |= passed
+        np.sum(passed, axis=1, out=self.rewards)
+        self.score += self.rewards
+
+        # Pixel-exact collision of the bird sprite with the top and bottom pipes,
+        # as in Pipe.collide: look up the bird rows under each pipe in its column
+        # (few pipes are ever in a column, so only those are looked at)
+        games, slots = np.nonzero(active & (pipe_x >= BIRD_X + PIPE_DX_MIN) & (pipe_x < BIRD_X + BIRD_SPRITE_WIDTH))
+        if games.size:
+            index = pipe_x[games, slots] - (BIRD_X + PIPE_DX_MIN)
+            top = bird_y[games].astype(np.int32)  # bird_y >= 0, so this is the floor
+            height = pipe_height[games, slots]
+            hit = (top + PIPE_FIRST_ROW[index] < height) | (top + PIPE_LAST_ROW[index] > height + PIPE_GAP)
+            alive[games[hit]] = False
+
+        # Remove pipes that are off screen
+        self.pipe_active &= pipe_x + PIPE_WIDTH >= 0
+
+        return self.observe(), self.rewards, ~alive
+
+    def observe(self):
+        """Fill and return the (n, OBS_SIZE) observation buffer, matching Simulation.get_state."""
+        obs = self.obs
+        ahead = self.pipe_active & (self.pipe_x + PIPE_WIDTH >= BIRD_X)
+        has_pipe = ahead.any(axis=1)
+        nearest = np.where(ahead, self.pipe_x, np.iinfo(np.int32).max).argmin(axis=1)
+        rows = np.arange(self.n)
+        height = self.pipe_height[rows, nearest]
+
+        obs[:, 0] = self.bird_y
+        obs[:, 1] = self.velocity
+        obs[:, 2] = np.where(has_pipe, self.pipe_x[rows, nearest] - BIRD_X, WIDTH - BIRD_X)
+        obs[:, 3] = np.where(has_pipe, height, 0)
+        obs[:, 4] = np.where(has_pipe, height + PIPE_GAP, HEIGHT - GROUND_HEIGHT)
+        return obs
+
+
+def main():
+    """Measure batched throughput (game-frames per second) for several batch sizes."""
+    import argparse
+
+    parser = argparse.ArgumentParser(description=main.__doc__)
+    parser.add_argument("--envs", type=int, nargs="+", default=[1, 100, 1000, 10000, 100000])
+    parser.add_argument("--frames", type=int, default=500)
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+
+    for n in args.envs:
+        batch = BatchSimulation(n, seed=args.seed)
+        obs = batch.obs
+        start = time.perf_counter()
+        for _ in range(args.frames):
+            obs, _rewards, dones = batch.step((obs[:, 1] > 0) & (obs[:, 0] + BIRD_HEIGHT > obs[:, 4] - 40))
+            if dones.any():
+                batch.reset(dones)
+        elapsed = time.perf_counter() - start
+        print(f"{n:>7} envs: {n * args.frames / elapsed:>14,.0f} game-frames/s")
+
+
+if __name__ == "__main__":
+    main()
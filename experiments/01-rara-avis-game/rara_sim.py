@@ -0,0 +1,292 @@
+"""Headless, deterministic simulation core for Rara Avis.
+
+Everything that decides the outcome of a game lives here: bird physics,
+pipe spawning and movement, collisions and scoring. Nothing in this module
+touches pygame, so it can run thousands of frames per second without a
+window. ``rara-avis.py`` is a thin renderer on top of ``Simulation``.
+
+Usage:
+    sim = Simulation(seed=42)
+    state, reward, done = sim.step(True)  # True = flap
+    saved = sim.snapshot()
+    ...
+    sim.restore(saved)  # rewind, e.g. to try another action in a search
+"""
+import random
+import time
+from operator import attrgetter
+
+# Screen dimensions (the simulation uses screen pixels as world units)
+WIDTH, HEIGHT = 800, 600
+
+# Game variables
+FPS = 60
+GRAVITY = 0.5
+FLAP_STRENGTH = -8
+PIPE_SPEED = 3
+PIPE_GAP = 180
+PIPE_FREQUENCY = 1800  # milliseconds
+PIPE_FREQUENCY_FRAMES = PIPE_FREQUENCY * FPS // 1000  # spawning is counted in frames
+GROUND_HEIGHT = 100
+BIRD_WIDTH, BIRD_HEIGHT = 40, 30
+PIPE_WIDTH = 70
+PIPE_MIN_HEIGHT = 100
+PIPE_MAX_HEIGHT = HEIGHT - GROUND_HEIGHT - PIPE_GAP - 100
+
+# Opaque pixels of the bird sprite, row by row: (first x, last x + 1) from
+# bird.x. This is the elliptical body plus the beak; the wing and eye stay
+# inside the body in every pose, so all poses share it. rara-avis.py checks
+# it against the sprites it draws (SpriteAtlas.validate).
+BIRD_SPANS = (
+    (15, 25), (12, 28), (9, 31), (8, 32), (6, 34), (5, 35), (4, 36), (3, 37), (2, 38), (2, 38),
+    (1, 39), (1, 39), (0, 51), (0, 51), (0, 51), (0, 51), (0, 51), (0, 51), (1, 51), (1, 39),
+    (2, 38), (2, 38), (3, 37), (4, 36), (5, 35), (6, 34), (8, 32), (9, 31), (12, 28), (15, 25),
+)
+BIRD_SPRITE_WIDTH = max(right for _left, right in BIRD_SPANS)  # the beak reaches past BIRD_WIDTH
+
+
+def overlapping_rows(left, right):
+    """Bird rows (first, last + 1) with pixels in columns [left, right) from bird.x.
+
+    The body is convex and the beak sits at its widest rows, so the rows
+    are always contiguous. Gaps within a row (body to beak tip) are narrower
+    than a pipe, so a row's extent is as good as its exact pixels.
+    """
+    rows = [row for row, (first, last) in enumerate(BIRD_SPANS) if first < right and left < last]
+    return (rows[0], rows[-1] + 1) if rows else (0, 0)
+
+
+# The bird rows under a pipe, indexed by pipe.x - bird.x + PIPE_WIDTH - 1 for
+# every pipe position that overlaps the sprite's columns
+PIPE_DX_MIN = 1 - PIPE_WIDTH
+PIPE_ROWS = tuple(overlapping_rows(dx, dx + PIPE_WIDTH) for dx in range(PIPE_DX_MIN, BIRD_SPRITE_WIDTH))
+
+
+class Bird:
+    __slots__ = ("x", "y", "prev_y", "velocity", "alive", "flap_count", "wing_angle", "wing_direction")
+    fields = attrgetter(*__slots__)  # tuple of every field, in slot order
+
+    def __init__(self):
+        self.x = WIDTH // 3
+        self.y = HEIGHT // 2
+        self.prev_y = self.y  # position one frame ago, for render interpolation
+        self.velocity = 0
+        self.alive = True
+        self.flap_count = 0
+        self.wing_angle = 0
+        self.wing_direction = 1
+
+    def snapshot(self):
+        return Bird.fields(self)
+
+    def restore(self, snapshot):
+        (self.x, self.y, self.prev_y, self.velocity, self.alive, self.flap_count,
+         self.wing_angle, self.wing_direction) = snapshot
+
+    def flap(self):
+        if self.alive:
+            self.velocity = FLAP_STRENGTH
+            self.flap_count += 1
+
+    def update(self):
+        self.prev_y = self.y
+
+        # Apply gravity
+        self.velocity += GRAVITY
+        self.y += self.velocity
+
+        # Update wing animation
+        self.wing_angle += 0.2 * self.wing_direction
+        if abs(self.wing_angle) > 0.5:
+            self.wing_direction *= -1
+
+        # Check if bird hits the ground or ceiling
+        if self.y >= HEIGHT - GROUND_HEIGHT - BIRD_HEIGHT:
+            self.y = HEIGHT - GROUND_HEIGHT - BIRD_HEIGHT
+            self.alive = False
+        if self.y <= 0:
+            self.y = 0
+            self.velocity = 0
+
+
+class Pipe:
+    __slots__ = ("x", "prev_x", "height", "passed")
+    fields = attrgetter(*__slots__)
+
+    def __init__(self, height):
+        self.x = WIDTH
+        self.prev_x = self.x
+        self.height = height
+        self.passed = False
+
+    def snapshot(self):
+        return Pipe.fields(self)
+
+    @classmethod
+    def from_snapshot(cls, snapshot):
+        pipe = cls.__new__(cls)
+        pipe.x, pipe.prev_x, pipe.height, pipe.passed = snapshot
+        return pipe
+
+    def update(self):
+        self.prev_x = self.x
+        self.x -= PIPE_SPEED
+
+    def collide(self, bird):
+        """Pixel-exact test of the bird sprite, as drawn, against both pipes."""
+        # Top pipe spans rows [0, height), bottom pipe spans [height + PIPE_GAP, HEIGHT)
+        dx = self.x - bird.x
+        if not PIPE_DX_MIN <= dx < BIRD_SPRITE_WIDTH:
+            return False
+        top = int(bird.y)  # sprites are blitted at whole pixels
+        gap_top = self.height
+        gap_bottom = gap_top + PIPE_GAP
+        if top >= gap_top and top + BIRD_HEIGHT <= gap_bottom:
+            return False  # the whole bounding box is inside the gap
+        first, last = PIPE_ROWS[dx - PIPE_DX_MIN]
+        return top + first < gap_top or top + last > gap_bottom
+
+
+class Simulation:
+    """One game of Rara Avis, advanced one frame per ``step``.
+
+    All randomness comes from a private ``random.Random`` seeded at reset, and
+    pipes spawn every ``PIPE_FREQUENCY_FRAMES`` frames, so the same seed and
+    the same sequence of actions always produce the same game.
+
+    ``snapshot`` captures everything that decides the rest of the game (bird,
+    pipes, counters and the RNG) as plain tuples, in time proportional to
+    the number of pipes; ``restore`` puts it back. The RNG is only drawn from
+    when a pipe spawns, so its state is fetched once per spawn, not per
+    snapshot.
+    """
+
+    # Renderers subclass Bird/Pipe to add drawing and point these at them
+    bird_class = Bird
+    pipe_class = Pipe
+
+    def __init__(self, seed=None):
+        self.reset(seed)
+
+    def reset(self, seed=None):
+        self.seed = seed
+        self.rng = random.Random(seed)
+        self.rng_state = None  # rng.getstate() while it is current, else None
+        self.bird = self.bird_class()
+        self.pipes = []
+        self.score = 0
+        self.frame = 0
+        self.last_pipe_frame = 0
+        return self.get_state()
+
+    def snapshot(self):
+        if self.rng_state is None:
+            self.rng_state = self.rng.getstate()
+        return (self.bird.snapshot(), [pipe.snapshot() for pipe in self.pipes],
+                self.score, self.frame, self.last_pipe_frame, self.rng_state)
+
+    def restore(self, snapshot):
+        bird, pipes, self.score, self.frame, self.last_pipe_frame, rng_state = snapshot
+        self.bird.restore(bird)
+        self.pipes = [self.pipe_class.from_snapshot(pipe) for pipe in pipes]
+        if rng_state is not self.rng_state:
+            self.rng.setstate(rng_state)
+            self.rng_state = rng_state
+
+    @property
+    def done(self):
+        return not self.bird.alive
+
+    def spawn_pipe(self):
+        height = self.rng.randint(PIPE_MIN_HEIGHT, PIPE_MAX_HEIGHT)
+        self.rng_state = None
+        self.pipes.append(self.pipe_class(height))
+        self.last_pipe_frame = self.frame
+
+    def step(self, action=False):
+        """Advance one frame. ``action`` is truthy to flap.
+
+        Returns ``(state, reward, done)`` where reward is the number of pipes
+        passed during this frame.
+        """
+        bird = self.bird
+        if not bird.alive:
+            return self.get_state(), 0, True
+
+        if action:
+            bird.flap()
+        bird.update()
+        self.frame += 1
+
+        # Generate new pipes
+        if self.frame - self.last_pipe_frame > PIPE_FREQUENCY_FRAMES:
+            self.spawn_pipe()
+
+        reward = 0
+        for pipe in self.pipes:
+            pipe.update()
+
+            # Check if bird passed the pipe
+            if not pipe.passed and pipe.x + PIPE_WIDTH < bird.x:
+                pipe.passed = True
+                reward += 1
+
+        # Check for collisions. Pipes spawn at the right edge and move together,
+        # so the list is sorted by x and only the first pipes can reach the bird.
+        bird_right = bird.x + BIRD_SPRITE_WIDTH
+        for pipe in self.pipes:
+            if pipe.x >= bird_right:
+                break
+            if pipe.collide(bird):
+                bird.alive = False
+                break
+
+        # Remove pipes that are off screen (they only ever leave from the front)
+        while self.pipes and self.pipes[0].x + PIPE_WIDTH < 0:
+            self.pipes.pop(0)
+
+        self.score += reward
+        return self.get_state(), reward, not bird.alive
+
+    def next_pipe(self):
+        """Return the first pipe the bird has not yet cleared, or None."""
+        for pipe in self.pipes:
+            if pipe.x + PIPE_WIDTH >= self.bird.x:
+                return pipe
+        return None
+
+    def get_state(self):
+        """Compact observation: (bird_y, velocity, pipe_dx, gap_top, gap_bottom)."""
+        bird = self.bird
+        pipe = self.next_pipe()
+        if pipe is None:
+            return (bird.y, bird.velocity, WIDTH - bird.x, 0, HEIGHT - GROUND_HEIGHT)
+        return (bird.y, bird.velocity, pipe.x - bird.x, pipe.height, pipe.height + PIPE_GAP)
+
+
+def main():
+    """Run headless games with a simple policy and report simulated frames per second."""
+    import argparse
+
+    parser = argparse.ArgumentParser(description=main.__doc__)
+    parser.add_argument("--frames", type=int, default=200000)
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+
+    sim = Simulation(seed=args.seed)
+    games = 0
+    start = time.perf_counter()
+    for _ in range(args.frames):
+        bird_y, velocity, _dx, gap_top, gap_bottom = sim.get_state()
+        flap = velocity > 0 and bird_y + BIRD_HEIGHT > gap_bottom - 40
+        _state, _reward, done = sim.step(flap)
+        if done:
+            games += 1
+            sim.reset(seed=args.seed + games)
+    elapsed = time.perf_counter() - start
+    print(f"{args.frames} frames, {games} games in {elapsed:.2f}s "
+          f"({args.frames / elapsed:,.0f} frames/s)")
+
+
+if __name__ == "__main__":
+    main()
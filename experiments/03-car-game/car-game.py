@@ -1,9 +1,29 @@
-import pygame
-import random
 import sys
+import time
+STARTUP_BEGIN = time.perf_counter()  # time zero for --startup-profile
 
-# Initialize Pygame
-pygame.init()
+# pygame only uses pkg_resources to locate its bundled data files and falls
+# back to plain paths without it; not importing it saves ~100 ms of startup.
+if "pkg_resources" not in sys.modules:
+    sys.modules["pkg_resources"] = None
+import pygame
+import argparse
+import os
+import random
+from collections import deque
+from itertools import chain
+
+# Helpers shared by the experiment games live in experiments/shared
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), os.pardir, "shared"))
+from textcache import TextCache, NumberText
+from dirtyrects import DirtyRects
+from timestep import FixedTimestep, lerp
+from profiler import FrameProfiler, ProfilerOverlay
+from startup import StartupProfile, sys_font
+from audio import AudioManager
+from replay import Replay, ReplayWriter, seek
+from gcpacer import GCPacer, AllocationSampler
+from scaling import ScaledDisplay, SCALERS, parse_size
 
 # Game constants
 SCREEN_WIDTH = 800
@@ -13,19 +33,50 @@ CAR_HEIGHT = 80
 OBSTACLE_WIDTH = 40
 OBSTACLE_HEIGHT = 60
 CAR_SPEED = 5
-OBSTACLE_SPEED = 3
 LANE_COUNT = 3
 LANE_WIDTH = SCREEN_WIDTH // LANE_COUNT
 FPS = 60
 
+# World streaming: the road is generated in chunks of CHUNK_HEIGHT pixels as
+# the camera approaches and dropped once the camera has passed them.
+CHUNK_HEIGHT = 600
+CHUNKS_AHEAD = 1  # chunks kept generated above the top of the screen
+OBSTACLE_ROW_SPACING = 200  # at most one cone per row, with room for the car between rows
+OBSTACLE_CHANCE = 0.9  # chance a row has a cone
+REBASE_CHUNKS = 10  # shift world coordinates back towards 0 every this many chunks
+
+# Road texture
+ROAD_COLOR = (100, 100, 100)
+SHOULDER_COLOR = (80, 80, 80)
+LANE_COLOR = (200, 200, 200)
+EDGE_LINE_COLOR = (235, 235, 235)
+SHOULDER_WIDTH = 14
+DASH_LENGTH, DASH_PERIOD = 20, 40
+ROAD_TILE_HEIGHT = SCREEN_HEIGHT  # a multiple of DASH_PERIOD, so the tile repeats seamlessly
+
+# Game actions, as recorded in replays
+LEFT, RIGHT, RESTART = range(3)
+
+# Window events after which even a static screen must be drawn again
+REDRAW_EVENTS = (pygame.VIDEOEXPOSE, pygame.WINDOWEXPOSED, pygame.VIDEORESIZE)
+
 # Colors
 WHITE = (255, 255, 255)
 BLACK = (0, 0, 0)
 RED = (255, 0, 0)
 
-# Set up the game window
-screen = pygame.display.set_mode((SCREEN_WIDTH, SCREEN_HEIGHT))
-pygame.display.set_caption("2D Car Game")
+# Display, images and fonts are created by init_display(), and sound by
+# init_audio() once the first frame is up, not at import time.
+screen = None
+display = None  # ScaledDisplay when the window is scaled
+car_img = None
+obstacle_img = None
+road_tile = None
+font = None
+small_font = None
+text_cache = TextCache()
+score_text = None
+audio = AudioManager()
 
 # Functions to generate procedural images as fallback
 def create_car_image(width, height):
@@ -96,50 +147,92 @@ def create_obstacle_image(width, height):
 
     return surface
 
-# Load images (with procedural fallback)
-try:
-    car_img = pygame.image.load('car.png').convert_alpha()
-    car_img = pygame.transform.scale(car_img, (CAR_WIDTH, CAR_HEIGHT))
-except (pygame.error, FileNotFoundError):
-    print("Note: 'car.png' not found, using procedural graphics.")
-    car_img = create_car_image(CAR_WIDTH, CAR_HEIGHT)
-
-try:
-    obstacle_img = pygame.image.load('obstacle.png').convert_alpha()
-    obstacle_img = pygame.transform.scale(obstacle_img, (OBSTACLE_WIDTH, OBSTACLE_HEIGHT))
-except (pygame.error, FileNotFoundError):
-    print("Note: 'obstacle.png' not found, using procedural graphics.")
-    obstacle_img = create_obstacle_image(OBSTACLE_WIDTH, OBSTACLE_HEIGHT)
-
-# Create a font for game-over text
-font = pygame.font.SysFont('Arial', 36)
-small_font = pygame.font.SysFont('Arial', 24)
-
-# Initialize mixer for sound
-pygame.mixer.init()
-
-# Try to load sound files (optional - game works without them)
-collision_sound = None
-background_music = None
-
-try:
-    collision_sound = pygame.mixer.Sound('collision.wav')
-    collision_sound.set_volume(0.7)
-except (pygame.error, FileNotFoundError):
-    pass
-
-try:
-    background_music = pygame.mixer.Sound('background_music.wav')
-    background_music.set_volume(0.3)
-    background_music.play(-1)  # Loop indefinitely
-except (pygame.error, FileNotFoundError):
-    pass
-
-if collision_sound is None and background_music is None:
-    print("Note: No sound files found, running without audio.")
+def create_road_tile(width, height):
+    """Create one vertically tileable stretch of road: asphalt, shoulders, edge lines and lane dashes"""
+    surface = pygame.Surface((width, height))
+    surface.fill(ROAD_COLOR)
+
+    # Shoulders with a solid edge line
+    pygame.draw.rect(surface, SHOULDER_COLOR, (0, 0, SHOULDER_WIDTH, height))
+    pygame.draw.rect(surface, SHOULDER_COLOR, (width - SHOULDER_WIDTH, 0, SHOULDER_WIDTH, height))
+    pygame.draw.line(surface, EDGE_LINE_COLOR, (SHOULDER_WIDTH, 0), (SHOULDER_WIDTH, height), 3)
+    pygame.draw.line(surface, EDGE_LINE_COLOR, (width - SHOULDER_WIDTH - 1, 0), (width - SHOULDER_WIDTH - 1, height), 3)
+
+    # Dashed lane dividers
+    for i in range(1, LANE_COUNT):
+        x = i * LANE_WIDTH
+        for y in range(0, height, DASH_PERIOD):
+            pygame.draw.line(surface, LANE_COLOR, (x, y), (x, y + DASH_LENGTH), 3)
+
+    return surface.convert()
+
+def init_display(offscreen=False, window_size=None, fullscreen=False, scaler="sdl"):
+    global screen, display, car_img, obstacle_img, road_tile, font, small_font, score_text
+
+    # Initialize only what drawing needs; the mixer is started by init_audio()
+    pygame.display.init()
+    pygame.font.init()
+
+    if offscreen:
+        # Draw into a plain surface (e.g. for observe.PixelObserver); the hidden
+        # 1x1 window only provides the pixel format images are converted to
+        pygame.display.set_mode((1, 1), pygame.HIDDEN)
+        screen = pygame.Surface((SCREEN_WIDTH, SCREEN_HEIGHT)).convert()
+        display = None
+    elif window_size or fullscreen:
+        # Draw at SCREEN_WIDTH x SCREEN_HEIGHT whatever the window size, and scale once per frame
+        display = ScaledDisplay((SCREEN_WIDTH, SCREEN_HEIGHT), window_size, fullscreen, scaler)
+        screen = display.surface
+        pygame.display.set_caption("2D Car Game")
+    else:
+        # Set up the game window
+        display = None
+        screen = pygame.display.set_mode((SCREEN_WIDTH, SCREEN_HEIGHT))
+        pygame.display.set_caption("2D Car Game")
+
+    # Load images (with procedural fallback)
+    try:
+        car_img = pygame.image.load('car.png').convert_alpha()
+        car_img = pygame.transform.scale(car_img, (CAR_WIDTH, CAR_HEIGHT))
+    except (pygame.error, FileNotFoundError):
+        print("Note: 'car.png' not found, using procedural graphics.")
+        car_img = create_car_image(CAR_WIDTH, CAR_HEIGHT)
+
+    try:
+        obstacle_img = pygame.image.load('obstacle.png').convert_alpha()
+        obstacle_img = pygame.transform.scale(obstacle_img, (OBSTACLE_WIDTH, OBSTACLE_HEIGHT))
+    except (pygame.error, FileNotFoundError):
+        print("Note: 'obstacle.png' not found, using procedural graphics.")
+        obstacle_img = create_obstacle_image(OBSTACLE_WIDTH, OBSTACLE_HEIGHT)
+
+    road_tile = create_road_tile(SCREEN_WIDTH, ROAD_TILE_HEIGHT)
+
+    # Create a font for game-over text
+    font = sys_font('Arial', 36)
+    small_font = sys_font('Arial', 24)
+    text_cache.clear()
+    score_text = NumberText(text_cache, small_font, "Score: ", BLACK)
+
+def init_audio():
+    # Start the mixer (sounds play on reserved channels, see AudioManager)
+    if not audio.start():
+        print("Note: No audio device, running without audio.")
+        return
+
+    # Try to load sound files (optional - game works without them).
+    # The music streams from disk and the collision sound loads in the
+    # background, so neither holds up the game.
+    if os.path.exists('collision.wav'):
+        audio.load_sound('collision', 'collision.wav', volume=0.7)
+    has_music = audio.play_music('background_music.wav', volume=0.3)  # Loop indefinitely
+
+    if not has_music and not os.path.exists('collision.wav'):
+        print("Note: No sound files found, running without audio.")
 
 # Player car class
 class Car:
+    __slots__ = ("x", "y", "speed", "lane", "width", "height")
+
     def __init__(self):
         # Start at bottom center
         self.x = SCREEN_WIDTH // 2 - CAR_WIDTH // 2
@@ -169,59 +262,148 @@ class Car:
     def draw(self, screen):
         screen.blit(car_img, (self.x, self.y))
 
-# Obstacle class
+# Obstacle class (a traffic cone standing still on the road)
 class Obstacle:
-    def __init__(self):
-        # Randomly select lane
-        self.lane = random.randint(0, LANE_COUNT - 1)
+    __slots__ = ("lane", "chunk", "x", "y", "width", "height")
+
+    def __init__(self, lane, y, chunk):
+        self.lane = lane
+        self.chunk = chunk  # index of the chunk that generated it
         self.x = self.lane * LANE_WIDTH + LANE_WIDTH // 2 - OBSTACLE_WIDTH // 2
-        self.y = -OBSTACLE_HEIGHT  # Start above screen
-        self.speed = OBSTACLE_SPEED
+        self.y = y  # world coordinates
         self.width = OBSTACLE_WIDTH
         self.height = OBSTACLE_HEIGHT
 
-    def update(self):
-        self.y += self.speed
-
-    def draw(self, screen):
-        screen.blit(obstacle_img, (self.x, self.y))
-
-    def is_off_screen(self):
-        return self.y > SCREEN_HEIGHT
+    def shift(self, dy):
+        self.y += dy
+
+    def draw(self, screen, camera_y):
+        screen.blit(obstacle_img, (self.x, self.y - camera_y))
+
+def generate_chunk(seed, chunk, top):
+    """Obstacles of road chunk ``chunk`` whose top edge is at world y ``top``.
+
+    Depends only on the seed and the chunk index, so any chunk can be
+    regenerated identically. Obstacles come out lowest (largest y) first.
+    Chunk 0 is where the car starts and is left empty.
+    """
+    if chunk <= 0:
+        return []
+    rng = random.Random(f"{seed}:{chunk}")
+    obstacles = []
+    for row in range(CHUNK_HEIGHT // OBSTACLE_ROW_SPACING):
+        if rng.random() < OBSTACLE_CHANCE:
+            y = top + CHUNK_HEIGHT - (row + 1) * OBSTACLE_ROW_SPACING
+            obstacles.append(Obstacle(rng.randrange(LANE_COUNT), y, chunk))
+    return obstacles
 
 # Game state
 class GameState:
-    def __init__(self):
+    """The car on an endless road streamed in chunks.
+
+    World y grows downwards, so the car drives towards negative y and chunk
+    ``k`` covers ``[chunk_top(k), chunk_top(k) + CHUNK_HEIGHT)``. Every
+    ``REBASE_CHUNKS`` chunks everything is shifted back down so coordinates
+    stay small (blit positions are 32-bit ints) however long a run lasts.
+
+    ``snapshot``/``restore`` save and rewind the state for lookahead search.
+    Obstacles never change apart from rebasing, so a snapshot shares them
+    and only records their y.
+    """
+    __slots__ = ("seed", "car", "lanes", "chunks", "next_chunk", "origin_chunk", "score",
+                 "game_over", "camera_y", "prev_camera_y")
+
+    def __init__(self, seed=None):
+        self.seed = random.randrange(2**32) if seed is None else seed
         self.car = Car()
-        self.obstacles = []
+        # Obstacles per lane, lowest on screen first; chunks are generated
+        # upwards, so each lane stays sorted by y
+        self.lanes = [deque() for _ in range(LANE_COUNT)]
+        self.chunks = deque()  # indices of the generated chunks, oldest first
+        self.next_chunk = 0
+        self.origin_chunk = 0  # chunk whose top is at world y 0
         self.score = 0
         self.game_over = False
-        self.camera_y = 0  # Camera offset for scrolling effect
-        self.background_y = 0  # For scrolling background effect
-        self.obstacle_spawn_rate = 30  # Frames between obstacle spawns
-        self.collision_played = False  # Track if collision sound was played
-
-    def spawn_obstacle(self):
-        if random.randint(1, self.obstacle_spawn_rate) == 1:
-            self.obstacles.append(Obstacle())
+        self.camera_y = self.car.y - SCREEN_HEIGHT // 2  # Camera offset for scrolling effect
+        self.prev_camera_y = self.camera_y
+        self.stream_chunks()
+
+    @property
+    def obstacles(self):
+        return chain.from_iterable(self.lanes)
+
+    def chunk_top(self, chunk):
+        return (self.origin_chunk - chunk) * CHUNK_HEIGHT
+
+    def stream_chunks(self):
+        """Generate chunks up to CHUNKS_AHEAD above the screen and drop the ones below it."""
+        horizon = self.camera_y - CHUNKS_AHEAD * CHUNK_HEIGHT
+        while self.chunk_top(self.next_chunk) + CHUNK_HEIGHT > horizon:
+            chunk = self.next_chunk
+            for obstacle in generate_chunk(self.seed, chunk, self.chunk_top(chunk)):
+                self.lanes[obstacle.lane].append(obstacle)
+            self.chunks.append(chunk)
+            self.next_chunk += 1
+
+        bottom = self.camera_y + SCREEN_HEIGHT
+        while self.chunks and self.chunk_top(self.chunks[0]) > bottom:
+            chunk = self.chunks.popleft()
+            for lane in self.lanes:
+                while lane and lane[0].chunk == chunk:
+                    lane.popleft()
+
+    def rebase(self):
+        """Shift the world down by REBASE_CHUNKS chunks once the car has driven that far."""
+        dy = REBASE_CHUNKS * CHUNK_HEIGHT
+        if self.car.y > -dy:
+            return
+        self.origin_chunk += REBASE_CHUNKS
+        self.car.y += dy
+        self.camera_y += dy
+        self.prev_camera_y += dy
+        for obstacle in self.obstacles:
+            obstacle.shift(dy)
+
+    def snapshot(self):
+        car = self.car
+        return (car.x, car.y, car.lane, self.score, self.game_over, self.camera_y, self.prev_camera_y,
+                self.next_chunk, self.origin_chunk, tuple(self.chunks),
+                [[(obstacle, obstacle.y) for obstacle in lane] for lane in self.lanes])
+
+    def restore(self, snapshot):
+        (x, y, lane, self.score, self.game_over, self.camera_y, self.prev_camera_y,
+         self.next_chunk, self.origin_chunk, chunks, lanes) = snapshot
+        car = self.car
+        car.x, car.y, car.lane = x, y, lane
+        self.chunks = deque(chunks)
+        for index, obstacles in enumerate(lanes):
+            lane = self.lanes[index] = deque()
+            for obstacle, y in obstacles:
+                obstacle.y = y
+                lane.append(obstacle)
+
+    def keyframe(self):
+        """The snapshot as plain data for replay files; obstacles regenerate from the seed."""
+        return [self.seed] + list(self.snapshot()[:-1])
+
+    def load_keyframe(self, keyframe):
+        self.seed = keyframe[0]
+        self.restore(keyframe[1:] + [[[] for _ in range(LANE_COUNT)]])
+        # The live chunks hold exactly the obstacles generated for them
+        for chunk in self.chunks:
+            for obstacle in generate_chunk(self.seed, chunk, self.chunk_top(chunk)):
+                self.lanes[obstacle.lane].append(obstacle)
 
     def update(self):
         if self.game_over:
             return
 
+        self.rebase()
+        self.prev_camera_y = self.camera_y
+
         # Update car position (always moving up relative to camera)
         self.car.y -= CAR_SPEED
 
-        # Update obstacles
-        for obstacle in self.obstacles:
-            obstacle.update()
-
-        # Remove obstacles that are off screen
-        self.obstacles = [obs for obs in self.obstacles if not obs.is_off_screen()]
-
-        # Spawn new obstacles
-        self.spawn_obstacle()
-
         # Update score based on how far we've gone
         self.score += 1
 
@@ -231,41 +413,40 @@ class GameState:
         # Update camera to follow car (keep car centered vertically)
         self.camera_y = self.car.y - (SCREEN_HEIGHT // 2)
 
-        # Keep camera within bounds
-        if self.camera_y < 0:
-            self.camera_y = 0
-        elif self.camera_y > SCREEN_HEIGHT - CAR_HEIGHT:
-            self.camera_y = SCREEN_HEIGHT - CAR_HEIGHT
+        # Generate the road ahead and drop what is behind
+        self.stream_chunks()
 
     def check_collisions(self):
-        car_rect = pygame.Rect(self.car.x, self.car.y, self.car.width, self.car.height)
-
-        for obstacle in self.obstacles:
-            obstacle_rect = pygame.Rect(obstacle.x, obstacle.y, obstacle.width, obstacle.height)
-            if car_rect.colliderect(obstacle_rect):
+        car = self.car
+        top, bottom = car.y, car.y + car.height
+        left, right = car.x, car.x + car.width
+
+        # Lanes do not overlap, so only obstacles in the car's lane can hit it.
+        # The lane runs from the lowest obstacle up, so skip those still below
+        # the car and stop at the first one entirely above it.
+        for obstacle in self.lanes[car.lane]:
+            if obstacle.y >= bottom:
+                continue
+            if obstacle.y + obstacle.height <= top:
+                break
+            # Same test as pygame.Rect.colliderect
+            if obstacle.x < right and left < obstacle.x + obstacle.width:
                 # Play collision sound if available
-                if collision_sound:
-                    collision_sound.play()
+                audio.play('collision')
                 self.game_over = True
                 break
 
-    def draw(self, screen):
-        # Clear screen with a simple background
-        screen.fill(WHITE)
-
-        # Draw a simple road (just lines to give illusion of movement)
-        road_color = (100, 100, 100)
-        lane_color = (200, 200, 200)
-
-        # Draw road background
-        pygame.draw.rect(screen, road_color, (0, 0, SCREEN_WIDTH, SCREEN_HEIGHT))
+    def draw(self, screen, alpha=1.0):
+        # Positions are interpolated between the last two ticks
+        if self.game_over:
+            alpha = 1.0
+        camera_y = lerp(self.prev_camera_y, self.camera_y, alpha)
 
-        # Draw lane dividers (moving with camera)
-        for i in range(1, LANE_COUNT):
-            x = i * LANE_WIDTH
-            # Draw dashed line for lane divider
-            for y in range(0, SCREEN_HEIGHT, 40):
-                pygame.draw.line(screen, lane_color, (x, y + self.camera_y), (x, y + 20 + self.camera_y), 3)
+        # Draw the road: the pre-rendered tile scrolls with the camera
+        offset = int(camera_y % ROAD_TILE_HEIGHT)
+        screen.blit(road_tile, (0, -offset))
+        if ROAD_TILE_HEIGHT - offset < SCREEN_HEIGHT:
+            screen.blit(road_tile, (0, ROAD_TILE_HEIGHT - offset))
 
         # Draw car (at fixed position on screen)
         car_screen_y = SCREEN_HEIGHT // 2  # Car always appears centered vertically
@@ -273,58 +454,293 @@ class GameState:
 
         # Draw obstacles (offset by camera)
         for obstacle in self.obstacles:
-            obstacle_screen_y = obstacle.y - self.camera_y
-            if 0 <= obstacle_screen_y <= SCREEN_HEIGHT:  # Only draw if on screen
+            obstacle_screen_y = obstacle.y - camera_y
+            if -obstacle.height < obstacle_screen_y < SCREEN_HEIGHT:  # Only draw if on screen
                 screen.blit(obstacle_img, (obstacle.x, obstacle_screen_y))
 
         # Draw score
-        score_text = small_font.render(f"Score: {self.score}", True, BLACK)
-        screen.blit(score_text, (10, 10))
+        score_text.draw(screen, self.score, (10, 10))
 
         # Draw game over message if needed
         if self.game_over:
-            game_over_text = font.render("GAME OVER!", True, RED)
-            restart_text = small_font.render("Press R to restart", True, BLACK)
+            game_over_text = text_cache.render(font, "GAME OVER!", RED)
+            restart_text = text_cache.render(small_font, "Press R to restart", BLACK)
             screen.blit(game_over_text, (SCREEN_WIDTH//2 - game_over_text.get_width()//2, SCREEN_HEIGHT//2 - 50))
             screen.blit(restart_text, (SCREEN_WIDTH//2 - restart_text.get_width()//2, SCREEN_HEIGHT//2 + 20))
 
+class Session:
+    """Consecutive games of one run: input actions, restarts and replay recording."""
+    def __init__(self, seed=None):
+        self.seed = seed
+        self.games = 0
+        self.ticks = 0  # game ticks since the session started
+        self.recorder = None  # ReplayWriter while recording
+        self.game_state = self.new_game()
+
+    def new_game(self):
+        # A seeded session gives every game its own seed
+        return GameState(None if self.seed is None else self.seed + self.games)
+
+    def handle_event(self, event):
+        if event.type == pygame.KEYDOWN:
+            if event.key == pygame.K_LEFT:
+                self.act(LEFT)
+            elif event.key == pygame.K_RIGHT:
+                self.act(RIGHT)
+            elif event.key == pygame.K_r and self.game_state.game_over:
+                self.act(RESTART)
+
+    def act(self, action):
+        """Apply a game action before the next tick (and record it for replays)."""
+        if self.recorder:
+            self.recorder.record(self.ticks, action)
+        if action == LEFT:
+            self.game_state.car.move_left()
+        elif action == RIGHT:
+            self.game_state.car.move_right()
+        elif action == RESTART:
+            self.games += 1
+            self.game_state = self.new_game()
+
+    def static_view(self):
+        """What the game over screen shows (only the car can still move), or None while playing."""
+        if not self.game_state.game_over:
+            return None
+        return (self.game_state.car.lane,)
+
+    def tick(self):
+        self.game_state.update()
+        self.ticks += 1
+        if self.recorder and self.ticks % self.recorder.keyframe_interval == 0:
+            self.recorder.keyframe(self.ticks, self.keyframe())
+
+    def keyframe(self):
+        return {"ticks": self.ticks, "games": self.games, "game": self.game_state.keyframe()}
+
+    def load_keyframe(self, keyframe):
+        self.ticks = keyframe["ticks"]
+        self.games = keyframe["games"]
+        self.game_state.load_keyframe(keyframe["game"])
+
+def track_dirty(dirty, game_state, alpha):
+    """Record where every moving or changing element is drawn this frame."""
+    if game_state.game_over:
+        alpha = 1.0
+    camera_y = lerp(game_state.prev_camera_y, game_state.camera_y, alpha)
+    car = game_state.car
+    dirty.track("car", (car.x, SCREEN_HEIGHT // 2, car.width, car.height))
+    for obstacle in game_state.obstacles:
+        obstacle_screen_y = obstacle.y - camera_y
+        if -obstacle.height < obstacle_screen_y < SCREEN_HEIGHT:
+            dirty.track(("obstacle", id(obstacle)), (obstacle.x, obstacle_screen_y, obstacle.width, obstacle.height))
+    # Lane dividers only change when the dash pattern moves
+    dash_phase = int(camera_y % ROAD_TILE_HEIGHT) % DASH_PERIOD
+    for i in range(1, LANE_COUNT):
+        dirty.track(("lane", i), (i * LANE_WIDTH - 2, 0, 5, SCREEN_HEIGHT), dash_phase)
+    dirty.track("score", score_text.rect(game_state.score, (10, 10)), game_state.score)
+
 # Main game function
-def main():
+def main(argv=None, input_script=None):
+    """Run the game. ``input_script(frame)``, if given, returns events to inject before each frame."""
+    parser = argparse.ArgumentParser(description="2D Car Game")
+    parser.add_argument("--dirty-rects", action="store_true",
+                        help="present only the regions that changed each frame")
+    parser.add_argument("--max-fps", type=int, default=FPS,
+                        help="render frame rate cap, 0 for uncapped (the game always ticks at %d Hz)" % FPS)
+    parser.add_argument("--lockstep", action="store_true",
+                        help="run exactly one game tick per rendered frame (deterministic runs)")
+    parser.add_argument("--frames", type=int, help="quit after this many frames")
+    parser.add_argument("--seed", type=int, help="seed the road layout")
+    parser.add_argument("--profile-out", metavar="PATH",
+                        help="write per-frame phase timings to PATH (.csv or .json) on exit")
+    parser.add_argument("--startup-profile", action="store_true",
+                        help="print how long each startup step took, up to the first frame")
+    parser.add_argument("--record", metavar="PATH", help="record the session's inputs to a replay file")
+    parser.add_argument("--replay", metavar="PATH", help="play back a replay file instead of taking input")
+    parser.add_argument("--seek", type=int, default=0, metavar="TICK", help="start the replay at this tick")
+    parser.add_argument("--capture", metavar="PATH",
+                        help="record the frames shown to a PNG sequence (frames/%%05d.png), raw RGB (.rgb) "
+                             "or, through ffmpeg, a video file; frames the writer cannot keep up with are dropped")
+    parser.add_argument("--window", type=parse_size, metavar="WxH",
+                        help="window size; the game still draws at %dx%d and is scaled to fit"
+                             % (SCREEN_WIDTH, SCREEN_HEIGHT))
+    parser.add_argument("--fullscreen", action="store_true", help="fill the screen, scaled the same way")
+    parser.add_argument("--scaler", choices=SCALERS, default="sdl",
+                        help="how --fullscreen scales each frame: sdl (the SCALED display flag, on the GPU "
+                             "where available) or software (pygame.transform.scale); --window always uses software")
+    parser.add_argument("--idle", action="store_true",
+                        help="on the game over screen draw once and sleep until input changes something, "
+                             "instead of redrawing every frame")
+    parser.add_argument("--gc-idle", action="store_true",
+                        help="freeze the startup heap and run garbage collections only in the idle time "
+                             "before each frame's deadline")
+    parser.add_argument("--gc-report", action="store_true",
+                        help="print garbage collection pauses on exit, split into idle time and the frame path")
+    parser.add_argument("--trace-allocs", type=int, metavar="FRAMES",
+                        help="snapshot tracemalloc every FRAMES frames and print the top allocation sites "
+                             "per frame on exit (slows the game down)")
+    args = parser.parse_args(argv)
+
+    replay = Replay.load(args.replay) if args.replay else None
+    if replay and replay.game != "car":
+        parser.error("%s is a %s replay" % (args.replay, replay.game))
+    if replay and args.record:
+        parser.error("--record and --replay cannot be combined")
+    seed = replay.seed if replay else args.seed
+    if args.record and seed is None:
+        seed = random.randrange(2**31)  # a replay needs a seed to reproduce the road
+
+    startup = StartupProfile(STARTUP_BEGIN)
+    startup.mark("imports")
+    init_display(window_size=args.window, fullscreen=args.fullscreen, scaler=args.scaler)
+    startup.mark("display, assets")
+
     # Initialize game state
-    game_state = GameState()
+    session = Session(seed)
+    player = seek(replay, session, args.seek) if replay else None
+    if args.record:
+        session.recorder = ReplayWriter(args.record, "car", seed)
 
     # Set up clock for FPS control
     clock = pygame.time.Clock()
 
+    dirty = None
+    if args.dirty_rects:
+        dirty = DirtyRects((SCREEN_WIDTH, SCREEN_HEIGHT), display=display or pygame.display)
+    drawn_game_over = None
+
+    # The game advances in fixed ticks; frames render as fast as --max-fps allows
+    timestep = FixedTimestep(FPS, lockstep=args.lockstep)
+
+    capture = None
+    if args.capture:
+        try:
+            from capture import FrameCapture  # needs numpy, which nothing else in the game uses
+            capture = FrameCapture(args.capture, screen, fps=args.max_fps or FPS)
+        except (ImportError, RuntimeError, OSError, ValueError) as error:
+            parser.error(str(error))
+
+    # Garbage collector pacing (starts after the first frame) and allocation sampling
+    pacer = GCPacer(idle=args.gc_idle) if args.gc_idle or args.gc_report else None
+    allocations = AllocationSampler(args.trace_allocs) if args.trace_allocs else None
+
+    # Frame-phase timings; F3 toggles the overlay
+    profiler = FrameProfiler(["events", "update", "draw", "flip", "tick"])
+    profiler_overlay = ProfilerOverlay(profiler, small_font, pos=(SCREEN_WIDTH - 300, 10))
+
+    # Idle mode sleeps on the game over screen; scripted and replayed runs need every frame
+    idle = args.idle and not input_script and not player
+    idle_view = None  # the static screen on display while idling
+    pending = []  # the event that ended the sleep
+
     # Main game loop
     running = True
-    while running:
+    while running and (args.frames is None or profiler.frame < args.frames):
+        if idle_view is not None:
+            # Nothing on screen changes without input: block until some arrives
+            pending.append(pygame.event.wait())
+            timestep.resume()
+        profiler.begin_frame()
+        if input_script:
+            for event in input_script(profiler.frame):
+                pygame.event.post(event)
+
         # Handle events
-        for event in pygame.event.get():
+        exposed = False
+        for event in chain(pending, pygame.event.get()):
             if event.type == pygame.QUIT:
                 running = False
+            if event.type in REDRAW_EVENTS:
+                exposed = True
+
+            if event.type == pygame.KEYDOWN and event.key == pygame.K_F3:
+                profiler_overlay.toggle()
 
-            if event.type == pygame.KEYDOWN:
-                if event.key == pygame.K_LEFT:
-                    game_state.car.move_left()
-                elif event.key == pygame.K_RIGHT:
-                    game_state.car.move_right()
-                elif event.key == pygame.K_r and game_state.game_over:
-                    # Restart game
-                    game_state = GameState()
+            if not player:
+                session.handle_event(event)
+        pending.clear()
+        profiler.mark("events")
+
+        if idle_view is not None and not exposed and (session.static_view(), profiler_overlay.visible) == idle_view:
+            profiler.end_frame()
+            continue  # the input changed nothing on screen
 
         # Update game state
-        game_state.update()
+        for _ in range(timestep.advance()):
+            if player:
+                player.apply(session)
+            session.tick()
+        profiler.mark("update")
 
         # Draw everything
-        game_state.draw(screen)
+        game_state = session.game_state
+        alpha = timestep.alpha
+        game_state.draw(screen, alpha)
+        profiler_overlay.draw(screen)
+        profiler.mark("draw")
 
         # Update the display
-        pygame.display.flip()
+        if dirty:
+            # The game-over text appears and disappears as a full frame
+            if game_state.game_over != drawn_game_over or exposed:
+                dirty.invalidate()
+                drawn_game_over = game_state.game_over
+            track_dirty(dirty, game_state, alpha)
+            if profiler_overlay.visible:
+                dirty.track("profiler", profiler_overlay.rect(), profiler_overlay.version)
+            dirty.present()
+        elif display:
+            display.flip()
+        else:
+            pygame.display.flip()
+        if capture:
+            # Copy the frame for the background writer
+            capture.grab(screen)
+            profiler.set_counter("capture drops", capture.dropped)
+        profiler.mark("flip")
+
+        # Sound starts once the first frame is on screen
+        if profiler.frame == 0:
+            startup.mark("first frame")
+            init_audio()
+            startup.mark("audio")
+            if args.startup_profile:
+                startup.report()
+            if pacer:
+                pacer.start()
 
         # Control frame rate
-        clock.tick(FPS)
-
+        if pacer:
+            # Collect in whatever is left of this frame's budget
+            pacer.collect_idle(profiler.frame_start, 1 / args.max_fps if args.max_fps else 0)
+            profiler.set_counter("gc pauses > 2 ms", pacer.frame_path_pauses()[1])
+        if allocations:
+            allocations.end_frame(profiler.frame)
+        clock.tick(args.max_fps)
+        profiler.mark("tick")
+        profiler.end_frame()
+
+        view = session.static_view()
+        idle_view = (view, profiler_overlay.visible) if idle and view is not None else None
+
+        if player and session.ticks >= replay.ticks:
+            player.apply(session)  # actions taken after the last tick, e.g. just before quitting
+            running = False
+
+    if capture:
+        frames, dropped = capture.close()
+        print("Captured %d frames to %s (%d dropped)" % (frames, args.capture, dropped))
+    if session.recorder:
+        session.recorder.close(session.ticks, session.keyframe())
+    if pacer:
+        if args.gc_report:
+            print(pacer.report())
+        pacer.close()
+    if allocations:
+        print(allocations.report())
+        allocations.close()
+    if args.profile_out:
+        profiler.dump(args.profile_out)
     pygame.quit()
 
 if __name__ == "__main__":
@@ -0,0 +1,104 @@
+"""Sound for the experiment games without stalling a frame.
+
+Music is streamed from disk by ``pygame.mixer.music`` instead of being
+decoded into memory as a ``Sound``. Sound effects are decoded on a
+background thread; until one is ready, ``play`` on it is a silent no-op.
+Every effect gets its own reserved mixer channel, allocated when the mixer
+starts, so playing one never has to search for or steal a channel.
+
+Usage:
+    audio = AudioManager()
+    if audio.start():
+        audio.play_music("music.wav", volume=0.3)
+        audio.load_sound("hit", "hit.wav", volume=0.7)
+    ...
+    audio.play("hit")
+"""
+import threading
+
+import pygame
+
+
+class SilentSound:
+    """Stands in for a sound that is missing or still loading."""
+
+    def play(self, *args, **kwargs):
+        return None
+
+    def stop(self):
+        pass
+
+    def set_volume(self, volume):
+        pass
+
+
+SILENT = SilentSound()
+
+
+class AudioManager:
+    def __init__(self, frequency=44100, buffer=512, channels=8):
+        self.frequency = frequency
+        self.buffer = buffer  # samples per mixing chunk; smaller means lower latency
+        self.num_channels = channels
+        self.enabled = False
+        self.sounds = {}  # name -> Sound, or SILENT until loaded
+        self.channels = {}  # name -> reserved Channel
+        self.loaders = []
+
+    def start(self):
+        """Start the mixer. Returns False (and stays silent) if there is no audio device."""
+        try:
+            pygame.mixer.init(frequency=self.frequency, buffer=self.buffer)
+        except pygame.error:
+            return False
+        pygame.mixer.set_num_channels(self.num_channels)
+        self.enabled = True
+        return True
+
+    def play_music(self, path, volume=1.0, loops=-1):
+        """Stream ``path`` as background music. Returns False if it could not be opened."""
+        if not self.enabled:
+            return False
+        try:
+            pygame.mixer.music.load(path)
+        except (pygame.error, FileNotFoundError):
+            return False
+        pygame.mixer.music.set_volume(volume)
+        pygame.mixer.music.play(loops)
+        return True
+
+    def load_sound(self, name, path, volume=1.0):
+        """Decode ``path`` in the background; ``play(name)`` is silent until it is ready."""
+        self.sounds[name] = SILENT
+        if not self.enabled:
+            return
+        if name not in self.channels:
+            # Channels below the reserved count are never picked by Sound.play()
+            index = len(self.channels)
+            if index >= self.num_channels:
+                raise ValueError("no mixer channel left to reserve for %r" % name)
+            self.channels[name] = pygame.mixer.Channel(index)
+            pygame.mixer.set_reserved(len(self.channels))
+
+        def load():
+            try:
+                sound = pygame.mixer.Sound(path)
+            except (pygame.error, FileNotFoundError):
+                return
+            sound.set_volume(volume)
+            self.sounds[name] = sound
+
+        loader = threading.Thread(target=load, name="load %s" % name, daemon=True)
+        loader.start()
+        self.loaders.append(loader)
+
+    def wait_loaded(self, timeout=None):
+        """Block until every background load has finished (for tools and tests)."""
+        for loader in self.loaders:
+            loader.join(timeout)
+
+    def play(self, name):
+        sound = self.sounds.get(name, SILENT)
+        if sound is SILENT:
+            return
+        self.channels[name].play(sound)
@@ -0,0 +1,168 @@
+"""Gameplay capture that never stalls the game loop.
+
+``grab`` copies the screen's raw pixels into one of a fixed pool of
+buffers (a plain memory copy, well under a millisecond for 800x600) and
+queues it. A background thread converts queued frames to RGB and writes
+them out, then returns the buffer to the pool. If the writer falls behind
+and every buffer is still queued, the frame is dropped and counted instead
+of waiting.
+
+Where frames go depends on ``path``:
+    frames/%05d.png   a PNG sequence (any path containing a % pattern)
+    capture.rgb       raw RGB24 frames back to back (.rgb or .raw)
+    capture.mp4       piped into ffmpeg (any other extension; needs ffmpeg on PATH)
+
+Usage:
+    capture = FrameCapture("capture.mp4", screen, fps=60)
+    ...
+    pygame.display.flip()
+    capture.grab(screen)
+    ...
+    frames, dropped = capture.close()
+"""
+import os
+import queue
+import shutil
+import struct
+import subprocess
+import threading
+import zlib
+
+import numpy as np
+
+POOL_SIZE = 8  # frame buffers; about an eighth of a second of slack for the writer at 60 fps
+PNG_COMPRESSION = 1  # zlib level; higher levels cost far more time than they save space here
+
+
+class RawWriter:
+    def __init__(self, path):
+        self.file = open(path, "wb")
+
+    def write(self, index, rgb):
+        self.file.write(rgb)
+
+    def close(self):
+        self.file.close()
+
+
+def png_chunk(kind, data):
+    return struct.pack(">I", len(data)) + kind + data + struct.pack(">I", zlib.crc32(kind + data))
+
+
+class PngWriter:
+    """PNG encoder on zlib, which releases the GIL; pygame.image.save holds it for the whole save."""
+
+    def __init__(self, pattern, size):
+        self.pattern = pattern
+        folder = os.path.dirname(pattern)
+        if folder:
+            os.makedirs(folder, exist_ok=True)
+        width, height = size
+        self.rows = np.zeros((height, 1 + 3 * width), dtype=np.uint8)  # filter byte 0, then RGB
+        self.header = b"\x89PNG\r\n\x1a\n" + png_chunk(b"IHDR", struct.pack(">IIBBBBB", width, height, 8, 2, 0, 0, 0))
+
+    def write(self, index, rgb):
+        self.rows[:, 1:] = rgb.reshape(len(rgb), -1)
+        data = zlib.compress(self.rows, PNG_COMPRESSION)
+        with open(self.pattern % index, "wb") as f:
+            f.write(self.header + png_chunk(b"IDAT", data) + png_chunk(b"IEND", b""))
+
+    def close(self):
+        pass
+
+
+class FfmpegWriter:
+    def __init__(self, path, size, fps):
+        ffmpeg = shutil.which("ffmpeg")
+        if ffmpeg is None:
+            raise RuntimeError("capturing to %s needs ffmpeg on PATH; "
+                               "use a .rgb file or a %%05d.png pattern instead" % path)
+        width, height = size
+        self.process = subprocess.Popen(
+            [ffmpeg, "-y", "-loglevel", "error", "-f", "rawvideo", "-pix_fmt", "rgb24",
+             "-s", f"{width}x{height}", "-r", str(fps), "-i", "-", "-pix_fmt", "yuv420p", path],
+            stdin=subprocess.PIPE)
+
+    def write(self, index, rgb):
+        self.process.stdin.write(rgb)
+
+    def close(self):
+        self.process.stdin.close()
+        self.process.wait()
+
+
+def open_writer(path, size, fps):
+    if "%" in path:
+        return PngWriter(path, size)
+    if os.path.splitext(path)[1].lower() in (".rgb", ".raw"):
+        return RawWriter(path)
+    return FfmpegWriter(path, size, fps)
+
+
+class FrameCapture:
+    def __init__(self, path, surface, fps=60, pool_size=POOL_SIZE):
+        if surface.get_bytesize() not in (3, 4):
+            raise ValueError("capture needs a 24 or 32-bit surface")
+        self.size = width, height = surface.get_size()
+        self.pitch = surface.get_pitch()
+        bytesize = surface.get_bytesize()
+        # Byte offsets of R, G and B within a pixel (pixels are little endian)
+        self.channels = [shift // 8 for shift in surface.get_shifts()[:3]]
+        self.bytesize = bytesize
+
+        self.writer = open_writer(path, self.size, fps)
+        self.free = queue.Queue()
+        for _ in range(pool_size):
+            self.free.put(np.empty(self.pitch * height, dtype=np.uint8))
+        self.pending = queue.Queue()
+        self.frames = 0  # frames queued for writing
+        self.dropped = 0
+        self.error = None
+        self.thread = threading.Thread(target=self.run, name="capture writer", daemon=True)
+        self.thread.start()
+
+    def grab(self, surface):
+        """Queue a copy of ``surface``; returns False if the frame was dropped."""
+        try:
+            buffer = self.free.get_nowait()
+        except queue.Empty:
+            self.dropped += 1
+            return False
+        view = surface.get_buffer()  # raw pixel rows, padding included; locked until released
+        np.copyto(buffer, np.frombuffer(view, dtype=np.uint8))
+        del view
+        self.pending.put((self.frames, buffer))
+        self.frames += 1
+        return True
+
+    def run(self):
+        width, height = self.size
+        rgb = np.empty((height, width, 3), dtype=np.uint8)
+        while True:
+            item = self.pending.get()
+            if item is None:
+                break
+            index, buffer = item
+            if self.error is None:
+                # Rows are ``pitch`` bytes apart and may end in padding
+                pixels = buffer.reshape(height, self.pitch)[:, :width * self.bytesize].reshape(
+                    height, width, self.bytesize)
+                for i, channel in enumerate(self.channels):
+                    rgb[..., i] = pixels[..., channel]
+                try:
+                    self.writer.write(index, rgb)
+                except OSError as error:
+                    self.error = error  # keep recycling buffers; nothing more gets written
+            self.free.put(buffer)
+
+    def close(self):
+        """Write out the queued frames and stop; returns (frames captured, frames dropped)."""
+        self.pending.put(None)
+        self.thread.join()
+        try:
+            self.writer.close()
+        except OSError as error:
+            self.error = self.error or error
+        if self.error is not None:
+            print("Capture stopped early: %s" % self.error)
+        return self.frames, self.dropped
@@ -0,0 +1,94 @@
+"""Dirty-rectangle presentation for the experiment games.
+
+The games still draw a complete frame into the screen surface, but most of
+it is the same as last frame. ``DirtyRects`` remembers where each entity
+was drawn on the previous frame and where it is now, merges those regions
+and presents only them with ``pygame.display.update(rects)``. When the
+changed area grows past a threshold it falls back to a full flip, which is
+cheaper than many small updates.
+
+Usage:
+    dirty = DirtyRects((WIDTH, HEIGHT))
+    dirty.track("bird", bird_rect)
+    dirty.track(("pipe", id(pipe)), pipe_rect)
+    dirty.present()
+"""
+import pygame
+
+
+class DirtyRects:
+    def __init__(self, size, threshold=0.5, display=pygame.display):
+        self.screen_rect = pygame.Rect((0, 0), size)
+        self.threshold = threshold
+        self.display = display  # anything with flip() and update(rects), e.g. a scaling.ScaledDisplay
+        self.previous = {}  # key -> (rect, token) presented last frame
+        self.current = {}
+        self.extra = []
+        self.full = True  # the first frame is always presented in full
+        self.full_frames = 0
+        self.partial_frames = 0
+
+    def track(self, key, rect, token=None):
+        """Record where entity ``key`` is drawn this frame.
+
+        ``token`` stands for anything else that changes its pixels (a score,
+        a hover flag); an entity with the same rect and token as last frame is
+        not presented again.
+        """
+        self.current[key] = (pygame.Rect(rect), token)
+
+    def add(self, rect):
+        """Mark a region as changed for this frame only."""
+        self.extra.append(pygame.Rect(rect))
+
+    def invalidate(self):
+        """Present the next frame in full (e.g. when an overlay appears)."""
+        self.full = True
+
+    def collect(self):
+        """Merged list of the regions that changed since the last present."""
+        rects = self.extra
+        previous = self.previous
+        for key, (rect, token) in self.current.items():
+            old = previous.pop(key, None)
+            if old is None:
+                rects.append(rect)
+            elif old[0] != rect or old[1] != token:
+                rects.append(rect)
+                rects.append(old[0])
+        # Entities that disappeared leave their old area behind
+        rects.extend(rect for rect, _token in previous.values())
+        return merge_rects(rects, self.screen_rect)
+
+    def present(self):
+        """Update the display and start tracking the next frame. Returns True on a full flip."""
+        rects = self.collect()
+        area = sum(rect.w * rect.h for rect in rects)
+        full = self.full or area > self.threshold * self.screen_rect.w * self.screen_rect.h
+        if full:
+            self.display.flip()
+            self.full_frames += 1
+        elif rects:
+            self.display.update(rects)
+            self.partial_frames += 1
+
+        self.previous = self.current
+        self.current = {}
+        self.extra = []
+        self.full = False
+        return full
+
+
+def merge_rects(rects, bounds):
+    """Clip rects to ``bounds`` and union overlapping ones until none overlap."""
+    merged = []
+    for rect in rects:
+        rect = rect.clip(bounds)
+        if not rect.w or not rect.h:
+            continue
+        index = rect.collidelist(merged)
+        while index != -1:
+            rect.union_ip(merged.pop(index))
+            index = rect.collidelist(merged)
+        merged.append(rect)
+    return merged
@@ -0,0 +1,177 @@
+"""Keep the cyclic garbage collector off the frame path.
+
+Python's collector runs whenever enough container objects have been
+allocated, which in a game loop means in the middle of an update or a draw.
+``GCPacer`` moves it to the idle slack at the end of a frame instead:
+
+* ``start`` (call once the startup assets are built) collects, then
+  ``gc.freeze``s everything alive so later collections never rescan the
+  fonts, sprites and caches, and turns automatic collection off.
+* ``collect_idle`` (call just before ``clock.tick``) runs the generation
+  that automatic collection would have run, but only if the frame's
+  remaining budget fits the longest recent pause of that generation. If the
+  frame rate is uncapped or frames keep running late, a backlog of
+  ``BACKLOG`` times the gen0 threshold forces the collection anyway.
+
+Every collection is timed through ``gc.callbacks`` and counted as idle or
+on the frame path, so ``report`` can show whether any pause over
+``PAUSE_LIMIT`` still hits a frame. Without ``idle`` the pacer only watches
+automatic collections, for comparison.
+
+``AllocationSampler`` snapshots ``tracemalloc`` every ``interval`` frames
+and attributes the blocks that appeared since the previous snapshot to
+their source lines. Blocks freed within the frame cancel out, so this is
+the net growth per frame: caches filling up, leaks, and the cyclic garbage
+awaiting collection, which is exactly what advances the gen0 count.
+
+Usage:
+    pacer = GCPacer(idle=True)
+    pacer.start()
+    ...
+    pacer.collect_idle(profiler.frame_start, 1 / 60)
+    clock.tick(60)
+    ...
+    print(pacer.report())
+    pacer.close()
+"""
+import collections
+import gc
+import os
+import time
+import tracemalloc
+
+PAUSE_LIMIT = 0.002  # seconds; longer pauses on the frame path are a visible hitch
+BACKLOG = 10  # gen0 thresholds of allocations before a collection is forced
+SLACK_MARGIN = 0.0005  # seconds left over for clock.tick's own timing
+INITIAL_ESTIMATES = (0.0002, 0.0005, 0.002)  # seconds, per generation, until measured
+ESTIMATE_DECAY = 0.95  # an old worst case fades by this much per collection
+
+
+class GCPacer:
+    def __init__(self, idle=True):
+        self.idle = idle
+        self.estimates = list(INITIAL_ESTIMATES)  # recent worst pause of each generation
+        self.collections = [0, 0, 0]
+        self.frozen = 0
+        self.where = None  # "startup", "idle" or "forced" while the pacer runs a collection
+        self.started = 0.0
+        # {where: [collections, longest pause, pauses over PAUSE_LIMIT]}
+        self.pauses = {where: [0, 0.0, 0] for where in ("startup", "idle", "forced", "frame")}
+        gc.callbacks.append(self.on_gc)
+
+    def on_gc(self, phase, info):
+        if phase == "start":
+            self.started = time.perf_counter()
+            return
+        pause = time.perf_counter() - self.started
+        generation = info["generation"]
+        self.collections[generation] += 1
+        self.estimates[generation] = max(pause, self.estimates[generation] * ESTIMATE_DECAY)
+        stats = self.pauses[self.where or "frame"]
+        stats[0] += 1
+        stats[1] = max(stats[1], pause)
+        if pause > PAUSE_LIMIT:
+            stats[2] += 1
+
+    def start(self):
+        """Freeze the startup heap and take over collection; call after the assets are built."""
+        if not self.idle:
+            return
+        self.where = "startup"
+        gc.collect()
+        self.where = None
+        gc.freeze()
+        self.frozen = gc.get_freeze_count()
+        gc.disable()
+
+    def due(self):
+        """The generation automatic collection would run now, or -1."""
+        counts = gc.get_count()
+        thresholds = gc.get_threshold()
+        for generation in (2, 1, 0):
+            if counts[generation] > thresholds[generation]:
+                return generation
+        return -1
+
+    def collect_idle(self, frame_start, budget):
+        """Collect if one is due and fits before ``frame_start + budget`` (0 budget: uncapped)."""
+        if not self.idle:
+            return
+        generation = self.due()
+        if generation < 0:
+            return
+        slack = frame_start + budget - time.perf_counter() if budget else 0.0
+        if slack > self.estimates[generation] + SLACK_MARGIN:
+            self.where = "idle"
+        elif gc.get_count()[0] > gc.get_threshold()[0] * BACKLOG:
+            self.where = "forced"
+        else:
+            return
+        gc.collect(generation)
+        self.where = None
+
+    def frame_path_pauses(self):
+        """Collections that ran inside a frame (automatically or forced), and how many were too long."""
+        return sum(self.pauses[where][0] for where in ("forced", "frame")), \
+            sum(self.pauses[where][2] for where in ("forced", "frame"))
+
+    def report(self):
+        lines = ["GC: %d collections (gen0 %d, gen1 %d, gen2 %d)%s" % (
+            (sum(self.collections),) + tuple(self.collections) +
+            (", %d startup objects frozen" % self.frozen if self.frozen else "",))]
+        for where, label in (("startup", "before freezing (startup)"), ("idle", "in idle time"), ("forced", "forced by backlog"),
+                             ("frame", "automatic, on the frame path")):
+            count, longest, long_pauses = self.pauses[where]
+            if count:
+                lines.append("  %-30s %5d, longest %.2f ms, %d over %.0f ms" % (
+                    label, count, longest * 1000, long_pauses, PAUSE_LIMIT * 1000))
+        long_pauses = self.frame_path_pauses()[1]
+        lines.append("  pauses over %.0f ms on the frame path: %d" % (PAUSE_LIMIT * 1000, long_pauses))
+        return "\n".join(lines)
+
+    def close(self):
+        """Stop watching and hand collection back to the interpreter."""
+        gc.callbacks.remove(self.on_gc)
+        if self.idle:
+            gc.unfreeze()
+            gc.enable()
+
+
+class AllocationSampler:
+    def __init__(self, interval, top=10):
+        self.interval = interval
+        self.top = top
+        self.filters = [tracemalloc.Filter(False, tracemalloc.__file__),
+                        tracemalloc.Filter(False, __file__)]
+        self.previous = None
+        self.frames = 0  # frames covered by the accumulated differences
+        self.sizes = collections.Counter()  # (filename, lineno): bytes
+        self.blocks = collections.Counter()
+        tracemalloc.start()
+
+    def end_frame(self, frame):
+        """Snapshot every ``interval`` frames; the snapshot itself takes a few milliseconds."""
+        if frame % self.interval:
+            return
+        snapshot = tracemalloc.take_snapshot().filter_traces(self.filters)
+        if self.previous is not None:
+            for stat in snapshot.compare_to(self.previous, "lineno"):
+                if stat.count_diff > 0:
+                    site = stat.traceback[0]
+                    self.sizes[site.filename, site.lineno] += stat.size_diff
+                    self.blocks[site.filename, site.lineno] += stat.count_diff
+            self.frames += self.interval
+        self.previous = snapshot
+
+    def report(self):
+        if not self.frames:
+            return "Allocations: no complete sampling interval"
+        lines = ["Allocations still alive at the next sample, per frame (%d frames sampled):" % self.frames]
+        for site, blocks in self.blocks.most_common(self.top):
+            filename, lineno = site
+            lines.append("  %8.1f blocks %9.1f B  %s:%d" % (
+                blocks / self.frames, self.sizes[site] / self.frames, os.path.basename(filename), lineno))
+        return "\n".join(lines)
+
+    def close(self):
+        tracemalloc.stop()
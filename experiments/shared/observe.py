@@ -0,0 +1,77 @@
+"""Rendered frames of the experiment games as NumPy arrays.
+
+``PixelObserver`` reads a surface the game has drawn into, usually the
+offscreen ``screen`` the games create with ``init_display(offscreen=True)``.
+``pixels()`` returns a ``pygame.surfarray.pixels3d`` view of the surface
+itself, with no copy. ``observe()`` turns the frame into an agent
+observation: optionally downsampled (one ``smoothscale`` into a
+preallocated surface), optionally grayscale, and optionally stacked with
+the previous frames. Everything is written into buffers allocated once in
+the constructor, so observing a frame allocates no pixel memory.
+
+Arrays from ``observe`` are (stack, height, width[, 3]) uint8. Views from
+``pixels`` are indexed [x, y] like surfarray, and keep the surface locked
+(it cannot be drawn on or blitted) until they are deleted.
+
+Usage:
+    car.init_display(offscreen=True)
+    observer = PixelObserver(car.screen, size=(84, 84), grayscale=True, stack=4)
+    game_state.update()
+    game_state.draw(car.screen)
+    obs = observer.observe()  # (4, 84, 84)
+"""
+import numpy as np
+import pygame
+
+# ITU-R BT.601 luma weights in 1/256ths (they sum to 256)
+GRAY_WEIGHTS = (77, 150, 29)
+
+
+class PixelObserver:
+    def __init__(self, source, size=None, grayscale=False, stack=1):
+        self.source = source
+        self.size = tuple(size) if size else source.get_size()
+        self.grayscale = grayscale
+        self.stack = stack
+        if self.size == source.get_size():
+            self.target = source
+        else:
+            # Same pixel format as the source, so smoothscale can write straight into it
+            self.target = pygame.Surface(self.size, 0, source)
+
+        width, height = self.size
+        shape = (stack, height, width) if grayscale else (stack, height, width, 3)
+        self.frames = np.zeros(shape, dtype=np.uint8)
+        if grayscale:
+            self.luma = np.zeros((height, width), dtype=np.uint16)
+            self.channel = np.zeros((height, width), dtype=np.uint16)
+
+    def pixels(self):
+        """Zero-copy (width, height, 3) view of the frame at the observation size."""
+        if self.target is not self.source:
+            pygame.transform.smoothscale(self.source, self.size, self.target)
+        return pygame.surfarray.pixels3d(self.target)
+
+    def reset(self):
+        """Forget the stacked history (e.g. at the start of an episode)."""
+        self.frames[:] = 0
+
+    def observe(self):
+        """Capture the current frame; returns the stacked observation buffer (reused every call)."""
+        frames = self.frames
+        if self.stack > 1:
+            frames[:-1] = frames[1:]  # oldest first, shifted in place
+        newest = frames[-1]
+
+        view = self.pixels().swapaxes(0, 1)  # (height, width, 3), still no copy
+        if self.grayscale:
+            luma, channel = self.luma, self.channel
+            np.multiply(view[..., 0], GRAY_WEIGHTS[0], out=luma, dtype=np.uint16)
+            for index in (1, 2):
+                np.multiply(view[..., index], GRAY_WEIGHTS[index], out=channel, dtype=np.uint16)
+                luma += channel
+            np.right_shift(luma, 8, out=newest, casting="unsafe")
+        else:
+            newest[:] = view
+        del view  # unlock the surface
+        return frames
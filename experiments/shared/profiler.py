@@ -0,0 +1,157 @@
+"""Per-phase frame-time profiler for the experiment games.
+
+The main loop calls ``begin_frame`` once per frame and ``mark(phase)`` at
+the end of each phase; the time since the previous mark is charged to that
+phase. The last ``capacity`` frames are kept in a ring buffer, summarized as
+p50/p95/p99 per phase, shown by ``ProfilerOverlay`` and written to CSV or
+JSON by ``dump``.
+
+Usage:
+    profiler = FrameProfiler(["events", "update", "draw", "flip", "tick"])
+    profiler.begin_frame()
+    ...
+    profiler.mark("events")
+    ...
+    profiler.end_frame()
+"""
+import csv
+import json
+import time
+
+import pygame
+
+
+class FrameProfiler:
+    def __init__(self, phases, capacity=3600):
+        self.phases = tuple(phases)
+        self.phase_index = {phase: i for i, phase in enumerate(self.phases)}
+        self.capacity = capacity
+        # samples[i][slot] is the time (seconds) phase i took in a frame;
+        # the extra last row holds the whole frame.
+        self.samples = [[0.0] * capacity for _ in range(len(self.phases) + 1)]
+        self.frame_numbers = [0] * capacity
+        self.count = 0
+        self.frame = 0
+        self.current = [0.0] * len(self.phases)
+        self.frame_start = self.last_mark = time.perf_counter()
+        self.counters = {}  # latest value of anything else worth showing, e.g. a quality level
+
+    def begin_frame(self):
+        self.frame_start = self.last_mark = time.perf_counter()
+        current = self.current
+        for i in range(len(current)):
+            current[i] = 0.0
+
+    def mark(self, phase):
+        """Charge the time since the previous mark to ``phase``."""
+        now = time.perf_counter()
+        self.current[self.phase_index[phase]] += now - self.last_mark
+        self.last_mark = now
+
+    def end_frame(self):
+        slot = self.frame % self.capacity
+        for i, value in enumerate(self.current):
+            self.samples[i][slot] = value
+        self.samples[-1][slot] = self.last_mark - self.frame_start
+        self.frame_numbers[slot] = self.frame
+        self.frame += 1
+        self.count = min(self.count + 1, self.capacity)
+
+    def set_counter(self, name, value):
+        self.counters[name] = value
+
+    def recorded(self, row):
+        """Samples of one row in recording order."""
+        if self.count < self.capacity:
+            return row[:self.count]
+        start = self.frame % self.capacity
+        return row[start:] + row[:start]
+
+    def percentiles(self, row, points=(50, 95, 99)):
+        values = sorted(self.recorded(row))
+        if not values:
+            return tuple(0.0 for _ in points)
+        last = len(values) - 1
+        return tuple(values[min(last, int(round(point / 100 * last)))] for point in points)
+
+    def summary(self):
+        """{phase: {"p50": ms, "p95": ms, "p99": ms}} including a "frame" total."""
+        result = {}
+        for name, row in zip(self.phases + ("frame",), self.samples):
+            p50, p95, p99 = self.percentiles(row)
+            result[name] = {"p50": p50 * 1000, "p95": p95 * 1000, "p99": p99 * 1000}
+        return result
+
+    def dump(self, path):
+        """Write the recorded per-frame samples (in ms) as CSV, or JSON if ``path`` ends in .json."""
+        columns = self.phases + ("frame",)
+        rows = [self.recorded(row) for row in self.samples]
+        frames = self.recorded(self.frame_numbers)
+        if path.endswith(".json"):
+            data = {
+                "summary": self.summary(),
+                "counters": self.counters,
+                "frames": frames,
+                "samples": {name: [value * 1000 for value in row] for name, row in zip(columns, rows)},
+            }
+            with open(path, "w") as f:
+                json.dump(data, f)
+        else:
+            with open(path, "w", newline="") as f:
+                writer = csv.writer(f)
+                writer.writerow(("frame_number",) + tuple(f"{name}_ms" for name in columns))
+                for i, frame in enumerate(frames):
+                    writer.writerow([frame] + [f"{row[i] * 1000:.4f}" for row in rows])
+
+
+class ProfilerOverlay:
+    """Toggleable on-screen table of the profiler's percentiles.
+
+    The text is re-rendered only every ``refresh_frames`` frames, so the
+    overlay itself costs a single blit most of the time.
+    """
+
+    def __init__(self, profiler, font, refresh_frames=30, pos=(10, 10)):
+        self.profiler = profiler
+        self.font = font
+        self.refresh_frames = refresh_frames
+        self.pos = pos
+        self.visible = False
+        self.surface = None
+        self.rendered_at = -refresh_frames
+        self.version = 0  # bumped whenever the overlay is re-rendered
+
+    def toggle(self):
+        self.visible = not self.visible
+        self.rendered_at = -self.refresh_frames
+
+    def rect(self):
+        if self.surface is None:
+            return (self.pos[0], self.pos[1], 0, 0)
+        return (self.pos[0], self.pos[1], self.surface.get_width(), self.surface.get_height())
+
+    def draw(self, screen):
+        if not self.visible:
+            return
+        if self.profiler.frame - self.rendered_at >= self.refresh_frames:
+            self.surface = self.render()
+            self.rendered_at = self.profiler.frame
+            self.version += 1
+        screen.blit(self.surface, self.pos)
+
+    def render(self):
+        lines = ["phase      p50    p95    p99 ms"]
+        for name, stats in self.profiler.summary().items():
+            lines.append(f"{name:<8} {stats['p50']:6.2f} {stats['p95']:6.2f} {stats['p99']:6.2f}")
+        for name, value in self.profiler.counters.items():
+            lines.append(f"{name}: {value}")
+
+        line_height = self.font.get_linesize()
+        rendered = [self.font.render(line, True, (255, 255, 255)) for line in lines]
+        width = max(surface.get_width() for surface in rendered) + 12
+        surface = pygame.Surface((width, line_height * len(lines) + 8))
+        surface.fill((20, 20, 20))
+        for i, line in enumerate(rendered):
+            surface.blit(line, (6, 4 + i * line_height))
+        surface.set_alpha(220)
+        return surface
@@ -0,0 +1,74 @@
+"""Adaptive quality: give up effects before giving up frames.
+
+``QualityGovernor`` watches how long each frame spends working (everything
+but the wait in ``clock.tick``) against the frame budget. When the rolling
+median over ``window`` frames runs past ``DOWN`` of the budget it steps to
+the next, cheaper level; when it stays under ``UP`` of the budget for
+``up_after`` frames it steps back. The median ignores one-off hitches
+(a sprite built on first use, the OS stealing a slice), which dropping
+effects would not fix anyway. The gap between the two thresholds, a
+settling period after every change, and a longer wait before stepping up
+again after a step up had to be undone, keep it from oscillating around a
+level the machine can only just hold.
+
+Level 0 is full quality; what each level turns off is up to the game.
+
+Usage:
+    governor = QualityGovernor(budget=1 / 60, levels=len(QUALITY_LEVELS))
+    ...
+    level = governor.update(time.perf_counter() - profiler.frame_start)
+    if level is not None:
+        apply_quality(level)
+    clock.tick(60)
+"""
+import collections
+
+DOWN = 0.9  # step down when frames use more than this share of the budget
+UP = 0.6  # step back up when they use less than this share for a while
+WINDOW = 31  # frames in the rolling median
+UP_AFTER = 120  # frames of headroom before stepping up (2 s at 60 fps)
+MAX_UP_AFTER = 3600  # longest wait before retrying a level that failed before
+
+
+class QualityGovernor:
+    def __init__(self, budget, levels, window=WINDOW, up_after=UP_AFTER):
+        self.budget = budget
+        self.levels = levels
+        self.level = 0
+        self.samples = collections.deque(maxlen=window)
+        self.up_after = up_after
+        self.headroom = 0  # consecutive frames under UP
+        self.frame = 0
+        self.last_up = None  # frame of the last step up
+        self.transitions = []  # (frame, old level, new level)
+
+    def update(self, work):
+        """Record a frame's working time in seconds; returns the new level on a change, else None."""
+        self.frame += 1
+        samples = self.samples
+        samples.append(work)
+        if len(samples) < samples.maxlen:
+            return None  # still settling after the last change
+        median = sorted(samples)[len(samples) // 2]
+
+        if median > self.budget * DOWN and self.level < self.levels - 1:
+            if self.last_up is not None and self.frame - self.last_up < self.up_after:
+                # The level above could not hold; wait longer before trying it again
+                self.up_after = min(self.up_after * 2, MAX_UP_AFTER)
+            return self.change(self.level + 1)
+
+        if median < self.budget * UP and self.level > 0:
+            self.headroom += 1
+            if self.headroom >= self.up_after:
+                self.last_up = self.frame
+                return self.change(self.level - 1)
+        else:
+            self.headroom = 0
+        return None
+
+    def change(self, level):
+        self.transitions.append((self.frame, self.level, level))
+        self.level = level
+        self.samples.clear()
+        self.headroom = 0
+        return level
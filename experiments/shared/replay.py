@@ -0,0 +1,189 @@
+"""Compact binary input replays with keyframes for seeking.
+
+A replay is the seed plus every game action (flap, lane change, pause,
+restart...) tagged with the simulation tick it was applied before. Actions
+are indexed by tick rather than by rendered frame, so a replay plays back
+identically at any frame rate, headless or on screen. Every
+``keyframe_interval`` ticks the game's own state is stored as well, so a
+player can jump to any tick by loading the nearest keyframe and simulating
+only the ticks after it.
+
+File layout (little endian), written as the game runs so that a crash still
+leaves a readable replay:
+
+    header   b"RAVR", version (u8), game name (8 bytes, NUL padded),
+             seed (i64), keyframe interval (u32)
+    records  tag (u8), ticks since the previous record (varint), then
+               tag < 0xFE: the action with that code, no payload
+               KEYFRAME:   payload length (varint), zlib-compressed JSON state
+               END:        payload length (varint), the final state
+
+Games provide ``ticks``, ``act(action)``, ``tick()``, ``keyframe()`` (a
+JSON-serialisable state) and ``load_keyframe(state)``.
+
+Usage:
+    game.recorder = ReplayWriter("replay.rvr", "rara", seed)
+    ...
+    game.recorder.close(game.ticks, game.keyframe())
+
+    replay = Replay.load("replay.rvr")
+    player = seek(replay, game, 3600)  # game is now at tick 3600
+    player.apply(game)
+    game.tick()
+"""
+import bisect
+import json
+import struct
+import zlib
+
+MAGIC = b"RAVR"
+VERSION = 1
+HEADER = struct.Struct("<4sB8sqI")
+KEYFRAME, END = 0xFE, 0xFF
+KEYFRAME_INTERVAL = 600  # ticks (10 s at 60 Hz)
+
+
+def write_varint(out, value):
+    while value >= 0x80:
+        out.append(value & 0x7F | 0x80)
+        value >>= 7
+    out.append(value)
+
+
+def read_varint(data, pos):
+    value = shift = 0
+    while True:
+        byte = data[pos]
+        pos += 1
+        value |= (byte & 0x7F) << shift
+        if byte < 0x80:
+            return value, pos
+        shift += 7
+
+
+def encode_state(state):
+    return zlib.compress(json.dumps(state, separators=(",", ":")).encode())
+
+
+def decode_state(payload):
+    return json.loads(zlib.decompress(payload))
+
+
+def normalize(state):
+    """``state`` as it reads back from a replay (tuples become lists), for comparisons."""
+    return json.loads(json.dumps(state))
+
+
+class ReplayWriter:
+    def __init__(self, path, game, seed, keyframe_interval=KEYFRAME_INTERVAL):
+        self.file = open(path, "wb")
+        self.keyframe_interval = keyframe_interval
+        self.last_tick = 0
+        self.file.write(HEADER.pack(MAGIC, VERSION, game.encode(), seed, keyframe_interval))
+
+    def write(self, tag, tick, payload=None):
+        record = bytearray((tag,))
+        write_varint(record, tick - self.last_tick)
+        self.last_tick = tick
+        if payload is not None:
+            write_varint(record, len(payload))
+            record += payload
+        self.file.write(record)
+
+    def record(self, tick, action):
+        self.write(action, tick)
+
+    def keyframe(self, tick, state):
+        self.write(KEYFRAME, tick, encode_state(state))
+        self.file.flush()
+
+    def close(self, tick, state):
+        """Finish the replay with the final tick and state, for verification."""
+        self.write(END, tick, encode_state(state))
+        self.file.close()
+
+
+class Replay:
+    def __init__(self, game, seed, keyframe_interval):
+        self.game = game
+        self.seed = seed
+        self.keyframe_interval = keyframe_interval
+        self.events = []  # (tick, action), in order
+        self.keyframes = []  # (tick, state), in order
+        self.end = None  # (tick, state), or None if the recording was cut short
+
+    @classmethod
+    def load(cls, path):
+        with open(path, "rb") as f:
+            data = f.read()
+        magic, version, game, seed, interval = HEADER.unpack_from(data)
+        if magic != MAGIC or version != VERSION:
+            raise ValueError("%s is not a version %d replay" % (path, VERSION))
+        replay = cls(game.rstrip(b"\0").decode(), seed, interval)
+        pos = HEADER.size
+        tick = 0
+        try:
+            while pos < len(data):
+                tag = data[pos]
+                delta, pos = read_varint(data, pos + 1)
+                tick += delta
+                if tag < KEYFRAME:
+                    replay.events.append((tick, tag))
+                    continue
+                length, pos = read_varint(data, pos)
+                if pos + length > len(data):
+                    break  # truncated record
+                state = decode_state(data[pos:pos + length])
+                pos += length
+                if tag == KEYFRAME:
+                    replay.keyframes.append((tick, state))
+                else:
+                    replay.end = (tick, state)
+        except (IndexError, zlib.error, ValueError):
+            pass  # keep everything up to the damaged record
+        return replay
+
+    @property
+    def ticks(self):
+        """Ticks covered: up to END, or to the last record of a cut-short recording."""
+        if self.end is not None:
+            return self.end[0]
+        last = [self.events[-1][0] if self.events else 0, self.keyframes[-1][0] if self.keyframes else 0]
+        return max(last)
+
+    def keyframe_before(self, tick):
+        """The last keyframe at or before ``tick`` as (tick, state), or (0, None)."""
+        index = bisect.bisect_right(self.keyframes, tick, key=lambda keyframe: keyframe[0])
+        return self.keyframes[index - 1] if index else (0, None)
+
+
+class ReplayPlayer:
+    """Feeds a replay's actions to a game, tick by tick."""
+
+    def __init__(self, replay, tick=0):
+        self.replay = replay
+        self.index = bisect.bisect_left(replay.events, tick, key=lambda event: event[0])
+
+    def apply(self, game):
+        """Apply the actions recorded for the game's current tick; call before ``game.tick()``,
+        and once more after the last tick for any actions taken after it."""
+        events = self.replay.events
+        while self.index < len(events) and events[self.index][0] <= game.ticks:
+            game.act(events[self.index][1])
+            self.index += 1
+
+    @property
+    def finished(self):
+        return self.index >= len(self.replay.events)
+
+
+def seek(replay, game, tick):
+    """Bring a freshly created ``game`` to ``tick`` via the nearest keyframe; returns the player."""
+    keyframe_tick, state = replay.keyframe_before(tick)
+    if state is not None:
+        game.load_keyframe(state)
+    player = ReplayPlayer(replay, keyframe_tick)
+    while game.ticks < tick:
+        player.apply(game)
+        game.tick()
+    return player
@@ -0,0 +1,118 @@
+"""Draw at a fixed logical size and scale to whatever the window is.
+
+The games draw every frame into an 800x600 surface whatever the window
+size; ``ScaledDisplay`` stretches it to the window (letterboxed to keep the
+aspect ratio) once per frame. Drawing then costs the same in a small
+window, fullscreen or on a high-DPI kiosk, and only the final scale depends
+on the window.
+
+Two scalers:
+    sdl       the pygame.SCALED display flag. SDL scales while presenting, on
+              the GPU where there is one, and reports mouse positions in
+              logical coordinates itself. SCALED picks its own window size,
+              so it is only used fullscreen.
+    software  the window is a plain display surface of the requested size;
+              ``flip`` scales the logical surface into it with
+              pygame.transform.scale (nearest neighbour) and ``to_logical``
+              maps mouse positions back. Always used for a given window size.
+
+``flip`` and ``update(rects)`` stand in for pygame.display's, so
+``DirtyRects`` can present through a ScaledDisplay.
+
+Usage:
+    display = ScaledDisplay((800, 600), window_size=(1920, 1080), scaler="software")
+    screen = display.surface
+    ...
+    mouse_pos = display.to_logical(pygame.mouse.get_pos())
+    display.flip()
+"""
+import argparse
+
+import pygame
+
+SCALERS = ("sdl", "software")
+
+
+def parse_size(text):
+    """argparse type for a WIDTHxHEIGHT window size."""
+    try:
+        width, height = (int(part) for part in text.lower().split("x"))
+    except ValueError:
+        raise argparse.ArgumentTypeError("expected WIDTHxHEIGHT, e.g. 1600x1200, not %r" % text)
+    if width <= 0 or height <= 0:
+        raise argparse.ArgumentTypeError("window size must be positive, not %r" % text)
+    return width, height
+
+
+class ScaledDisplay:
+    def __init__(self, logical_size, window_size=None, fullscreen=False, scaler="sdl"):
+        self.logical_size = logical_size
+        if window_size and not fullscreen:
+            scaler = "software"  # pygame has no public way to size a SCALED window
+        self.scaler = scaler
+        flags = pygame.FULLSCREEN if fullscreen else pygame.RESIZABLE
+        if scaler == "sdl":
+            self.surface = pygame.display.set_mode(logical_size, pygame.SCALED | flags)
+            self.window = None
+            return
+        self.window = pygame.display.set_mode((0, 0) if fullscreen else window_size or logical_size, flags)
+        self.surface = pygame.Surface(logical_size).convert()
+        self.window_size = None
+        self.target_rect = None  # letterboxed area of the window the frame is scaled into
+        self.target = None
+        self.fit()
+
+    def fit(self):
+        """Follow the window's size; returns True if it changed since the last frame."""
+        self.window = pygame.display.get_surface()
+        window_size = self.window.get_size()
+        if window_size == self.window_size:
+            return False
+        self.window_size = window_size
+        logical_width, logical_height = self.logical_size
+        scale = min(window_size[0] / logical_width, window_size[1] / logical_height)
+        width = max(1, round(logical_width * scale))
+        height = max(1, round(logical_height * scale))
+        self.target_rect = pygame.Rect((window_size[0] - width) // 2, (window_size[1] - height) // 2, width, height)
+        self.window.fill((0, 0, 0))  # the letterbox bars
+        self.target = self.window.subsurface(self.target_rect)
+        return True
+
+    def flip(self):
+        if self.window is None:
+            pygame.display.flip()
+            return
+        self.fit()
+        pygame.transform.scale(self.surface, self.target_rect.size, self.target)
+        pygame.display.flip()
+
+    def update(self, rects):
+        """Present only ``rects`` (logical coordinates); the scale itself still covers the frame."""
+        if self.window is None:
+            pygame.display.update(rects)
+            return
+        resized = self.fit()
+        pygame.transform.scale(self.surface, self.target_rect.size, self.target)
+        if resized:
+            pygame.display.flip()
+        else:
+            pygame.display.update([self.to_window(rect) for rect in rects])
+
+    def to_window(self, rect):
+        """Window area covering logical ``rect``, rounded outwards."""
+        target = self.target_rect
+        logical_width, logical_height = self.logical_size
+        left = target.x + rect.left * target.w // logical_width
+        top = target.y + rect.top * target.h // logical_height
+        right = target.x + -(-rect.right * target.w // logical_width)
+        bottom = target.y + -(-rect.bottom * target.h // logical_height)
+        return pygame.Rect(left, top, right - left, bottom - top)
+
+    def to_logical(self, pos):
+        """Logical coordinates of a window position, e.g. the mouse."""
+        if self.window is None:
+            return pos  # SDL already reports logical coordinates
+        target = self.target_rect
+        logical_width, logical_height = self.logical_size
+        return ((pos[0] - target.x) * logical_width // target.w,
+                (pos[1] - target.y) * logical_height // target.h)
@@ -0,0 +1,146 @@
+"""Startup helpers for the experiment games.
+
+``pygame.font.SysFont`` scans every installed font the first time it is
+called (``fc-list`` on Linux, the registry on Windows), which can take
+longer than everything else before the first frame. ``sys_font`` resolves
+each (name, bold, italic) once, keeps the answer in a small JSON file in
+the user's cache directory and afterwards opens the font file directly.
+
+``StartupProfile`` records how long each startup step took, for the games'
+``--startup-profile`` report.
+
+Usage:
+    startup = StartupProfile(STARTUP_BEGIN)
+    font = sys_font("Arial", 36)
+    startup.mark("fonts")
+    ...
+    startup.mark("first frame")
+    startup.report()
+"""
+import hashlib
+import json
+import os
+import sys
+import time
+
+import pygame
+
+FONT_CACHE_VERSION = 1
+
+
+def cache_dir():
+    base = os.environ.get("LOCALAPPDATA") or os.environ.get("XDG_CACHE_HOME") or os.path.join(
+        os.path.expanduser("~"), ".cache")
+    return os.path.join(base, "rara-avis-experiments")
+
+
+class FontCache:
+    """Resolved system font files, persisted across runs.
+
+    Entries are keyed by a hash of the request and the pygame version, and
+    hold exactly what SysFont would have passed to its font constructor:
+    the file path and whether bold/italic have to be synthesized.
+    """
+
+    def __init__(self, path=None):
+        self.path = path or os.path.join(cache_dir(), "fonts.json")
+        self.entries = None
+        self.hits = 0
+        self.misses = 0
+
+    def load(self):
+        try:
+            with open(self.path) as f:
+                data = json.load(f)
+            if data.get("version") == FONT_CACHE_VERSION:
+                self.entries = data["fonts"]
+                return
+        except (OSError, ValueError, KeyError):
+            pass
+        self.entries = {}
+
+    def save(self):
+        try:
+            os.makedirs(os.path.dirname(self.path), exist_ok=True)
+            with open(self.path, "w") as f:
+                json.dump({"version": FONT_CACHE_VERSION, "fonts": self.entries}, f, indent=1)
+        except OSError:
+            pass  # a read-only home only costs the next run a font scan
+
+    @staticmethod
+    def key(name, bold, italic):
+        request = f"{name}|{bool(bold)}|{bool(italic)}|{pygame.version.ver}|{sys.platform}"
+        return hashlib.sha1(request.encode()).hexdigest()
+
+    def font(self, name, size, bold=False, italic=False):
+        if self.entries is None:
+            self.load()
+        key = self.key(name, bold, italic)
+        entry = self.entries.get(key)
+        if entry is not None and (entry[0] is None or os.path.exists(entry[0])):
+            self.hits += 1
+            return make_font(entry[0], size, entry[1], entry[2])
+
+        self.misses += 1
+        resolved = []
+
+        def constructor(path, size, set_bold, set_italic):
+            resolved.extend((path, set_bold, set_italic))
+            return make_font(path, size, set_bold, set_italic)
+
+        font = pygame.font.SysFont(name, size, bold, italic, constructor=constructor)
+        self.entries[key] = resolved
+        self.save()
+        return font
+
+
+def make_font(path, size, bold, italic):
+    # Same as pygame.sysfont.font_constructor
+    font = pygame.font.Font(path, size)
+    if bold:
+        font.set_bold(True)
+    if italic:
+        font.set_italic(True)
+    return font
+
+
+font_cache = FontCache()
+
+
+def sys_font(name, size, bold=False, italic=False):
+    """Drop-in for ``pygame.font.SysFont`` that remembers where the font file was found."""
+    return font_cache.font(name, size, bold, italic)
+
+
+class StartupProfile:
+    def __init__(self, start=None):
+        self.start = time.perf_counter() if start is None else start
+        self.last = self.start
+        self.steps = []  # (name, seconds)
+
+    def mark(self, name):
+        """Charge the time since the previous mark to step ``name``."""
+        now = time.perf_counter()
+        self.steps.append((name, now - self.last))
+        self.last = now
+
+    def elapsed(self, name):
+        """Seconds from the start to the end of step ``name``."""
+        total = 0.0
+        for step, seconds in self.steps:
+            total += seconds
+            if step == name:
+                return total
+        return None
+
+    def report(self, file=None):
+        file = file or sys.stdout
+        print("Startup profile (ms since the script started):", file=file)
+        total = 0.0
+        for name, seconds in self.steps:
+            total += seconds
+            print(f"  {name:<14} {seconds * 1000:8.1f} {total * 1000:8.1f}", file=file)
+        first_frame = self.elapsed("first frame")
+        if first_frame is not None:
+            print(f"  time to first frame: {first_frame * 1000:.1f} ms", file=file)
+        print(f"  font cache: {font_cache.hits} hits, {font_cache.misses} misses ({font_cache.path})", file=file)
@@ -0,0 +1,86 @@
+"""Cached text rendering for the experiment games.
+
+``font.render`` is one of the most expensive calls in a frame, and almost
+all on-screen text is the same from one frame to the next. ``TextCache``
+keeps rendered surfaces in a size-bounded LRU, and ``NumberText`` draws a
+label plus a changing number from cached digit glyphs so a ticking score
+never renders or allocates a new Surface.
+"""
+from collections import OrderedDict
+
+
+class TextCache:
+    """LRU cache of rendered text keyed on (font, text, color, antialias).
+
+    Memory is bounded by the total pixel bytes of the cached surfaces; the
+    least recently used entries are evicted first.
+    """
+
+    def __init__(self, max_bytes=4 * 1024 * 1024):
+        self.max_bytes = max_bytes
+        self.bytes = 0
+        self.entries = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+
+    def render(self, font, text, color, antialias=True):
+        key = (font, text, color, antialias)
+        surface = self.entries.get(key)
+        if surface is not None:
+            self.entries.move_to_end(key)
+            self.hits += 1
+            return surface
+
+        self.misses += 1
+        surface = font.render(text, antialias, color)
+        self.entries[key] = surface
+        self.bytes += surface_bytes(surface)
+        while self.bytes > self.max_bytes and len(self.entries) > 1:
+            _key, evicted = self.entries.popitem(last=False)
+            self.bytes -= surface_bytes(evicted)
+        return surface
+
+    def clear(self):
+        self.entries.clear()
+        self.bytes = 0
+
+
+class NumberText:
+    """A fixed label followed by an integer, composed from cached glyphs.
+
+    The label and the ten digit glyphs are rendered once; drawing a value
+    only blits them, so a counter that changes every frame costs no font
+    rendering and no new surfaces.
+    """
+
+    def __init__(self, cache, font, label, color, antialias=True):
+        self.label = cache.render(font, label, color, antialias)
+        self.minus = cache.render(font, "-", color, antialias)
+        self.digits = [cache.render(font, str(digit), color, antialias) for digit in range(10)]
+
+    def width(self, value):
+        width = self.label.get_width()
+        for char in str(value):
+            glyph = self.minus if char == "-" else self.digits[ord(char) - 48]
+            width += glyph.get_width()
+        return width
+
+    def rect(self, value, pos):
+        """Bounds ``(x, y, w, h)`` of ``value`` drawn at ``pos``."""
+        return (pos[0], pos[1], self.width(value), self.label.get_height())
+
+    def draw(self, surface, value, pos):
+        x, y = pos
+        surface.blit(self.label, (x, y))
+        x += self.label.get_width()
+        for char in str(value):
+            glyph = self.minus if char == "-" else self.digits[ord(char) - 48]
+            surface.blit(glyph, (x, y))
+            x += glyph.get_width()
+
+    def draw_centered(self, surface, value, center_x, y):
+        self.draw(surface, value, (center_x - self.width(value) // 2, y))
+
+
+def surface_bytes(surface):
+    return surface.get_width() * surface.get_height() * surface.get_bytesize()
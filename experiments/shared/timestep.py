@@ -0,0 +1,65 @@
+"""Fixed-timestep game loop helper for the experiment games.
+
+The games' physics constants are tuned per 1/60 s tick. ``FixedTimestep``
+turns however long the last rendered frame took into a whole number of
+those ticks, so gameplay runs at the same speed whether the machine renders
+at 30 or 300 FPS. The leftover fraction of a tick is exposed as ``alpha``
+for interpolating positions between the last two ticks when drawing.
+
+Usage:
+    timestep = FixedTimestep(60)
+    while True:
+        for _ in range(timestep.advance()):
+            update()
+        draw(timestep.alpha)
+"""
+import time
+
+
+class FixedTimestep:
+    def __init__(self, tick_rate, max_ticks_per_frame=5, lockstep=False):
+        self.tick_rate = tick_rate
+        self.dt = 1.0 / tick_rate
+        # After a long stall, run at most this many ticks and drop the rest
+        # rather than falling further behind (the "spiral of death").
+        self.max_ticks_per_frame = max_ticks_per_frame
+        self.accumulator = 0.0
+        self.last_time = None
+        self.dropped_ticks = 0
+        # Lockstep runs exactly one tick per frame regardless of wall time, so
+        # a scripted run is reproducible on any machine.
+        self.lockstep = lockstep
+
+    def advance(self):
+        """Account for the time since the last call and return how many ticks to run."""
+        if self.lockstep:
+            return 1
+        now = time.perf_counter()
+        if self.last_time is None:
+            self.last_time = now
+        self.accumulator += now - self.last_time
+        self.last_time = now
+
+        ticks = int(self.accumulator / self.dt)
+        if ticks > self.max_ticks_per_frame:
+            self.dropped_ticks += ticks - self.max_ticks_per_frame
+            ticks = self.max_ticks_per_frame
+            self.accumulator = 0.0
+        else:
+            self.accumulator -= ticks * self.dt
+        return ticks
+
+    def resume(self):
+        """Forget the time since the last frame, e.g. after sleeping on a static screen."""
+        self.last_time = None
+
+    @property
+    def alpha(self):
+        """Fraction of a tick elapsed since the last one, in [0, 1)."""
+        if self.lockstep:
+            return 1.0
+        return min(self.accumulator / self.dt, 1.0)
+
+
+def lerp(previous, current, alpha):
+    return previous + (current - previous) * alpha
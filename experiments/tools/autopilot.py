@@ -0,0 +1,211 @@
+"""Search-based autopilots for both games, built on snapshot/restore.
+
+Every few frames the autopilot searches its action choices a couple of
+seconds ahead, depth first, rewinding the game with ``snapshot``/``restore``
+instead of copying it. A plan is good if the game is still running at the
+horizon. The rest of the previous plan is tried first, so most searches
+only confirm it and extend it by one decision. A search that runs out of
+its node budget follows the plan that survived longest.
+
+Rara Avis decides between flapping and gliding, the car game between
+staying in its lane and moving left or right. Both search the real game
+logic, so the lookahead is exact. The report includes how many search nodes
+(one decision simulated for ``decision_frames`` frames) were expanded per
+second.
+
+Usage:
+    python experiments/tools/autopilot.py --game rara --games 5
+    python experiments/tools/autopilot.py --game car --max-frames 20000
+"""
+import argparse
+import importlib.util
+import os
+import sys
+import time
+
+EXPERIMENTS = os.path.join(os.path.dirname(os.path.abspath(__file__)), os.pardir)
+sys.path.insert(0, os.path.join(EXPERIMENTS, "01-rara-avis-game"))
+
+NODE_BUDGET = 20000  # nodes per search before settling for the longest plan
+
+
+class RaraModel:
+    """rara_sim.Simulation; action True flaps on the first frame of the decision."""
+    ACTIONS = (False, True)
+    decision_frames = 6
+    horizon = 120
+
+    def __init__(self, seed):
+        import rara_sim
+        self.sim = rara_sim.Simulation(seed)
+
+    def snapshot(self):
+        return self.sim.snapshot()
+
+    def restore(self, snapshot):
+        self.sim.restore(snapshot)
+
+    def advance(self, action):
+        """Play one decision; returns False if the game ended during it."""
+        sim = self.sim
+        done = sim.step(action)[2]
+        for _ in range(self.decision_frames - 1):
+            if done:
+                break
+            done = sim.step(False)[2]
+        return not done
+
+    @property
+    def frames(self):
+        return self.sim.frame
+
+    @property
+    def score(self):
+        return self.sim.score
+
+
+class CarModel:
+    """The car game's GameState; actions are 0 stay, 1 left, 2 right."""
+    ACTIONS = (0, 1, 2)
+    decision_frames = 8
+    horizon = 120
+    module = None
+
+    def __init__(self, seed):
+        if CarModel.module is None:
+            os.environ.setdefault("PYGAME_HIDE_SUPPORT_PROMPT", "1")
+            path = os.path.join(EXPERIMENTS, "03-car-game", "car-game.py")
+            spec = importlib.util.spec_from_file_location("car_game", path)
+            CarModel.module = importlib.util.module_from_spec(spec)
+            spec.loader.exec_module(CarModel.module)
+        self.game = self.module.GameState(seed)
+
+    def snapshot(self):
+        return self.game.snapshot()
+
+    def restore(self, snapshot):
+        self.game.restore(snapshot)
+
+    def advance(self, action):
+        game = self.game
+        if action == 1:
+            game.car.move_left()
+        elif action == 2:
+            game.car.move_right()
+        for _ in range(self.decision_frames):
+            game.update()
+            if game.game_over:
+                return False
+        return True
+
+    @property
+    def frames(self):
+        return self.game.score  # the score counts frames survived
+
+    @property
+    def score(self):
+        return self.game.score
+
+
+MODELS = {"rara": RaraModel, "car": CarModel}
+
+
+class BudgetExhausted(Exception):
+    pass
+
+
+class Autopilot:
+    def __init__(self, model, node_budget=NODE_BUDGET):
+        self.model = model
+        self.depth = model.horizon // model.decision_frames
+        self.node_budget = node_budget
+        self.plan = []
+        self.nodes = 0
+        self.searches = 0
+        self.search_time = 0.0
+        self.max_search_time = 0.0
+
+    def search(self):
+        """Plan ``depth`` decisions ahead from the current state, leaving the state unchanged."""
+        model = self.model
+        previous = self.plan
+        path = []
+        longest = []
+        budget = self.nodes + self.node_budget
+
+        def expand(depth):
+            nonlocal longest
+            if depth == self.depth:
+                return True
+            saved = model.snapshot()
+            preferred = previous[depth] if depth < len(previous) else model.ACTIONS[0]
+            for action in (preferred,) + tuple(a for a in model.ACTIONS if a != preferred):
+                if self.nodes >= budget:
+                    raise BudgetExhausted
+                self.nodes += 1
+                path.append(action)
+                if model.advance(action):
+                    if len(path) > len(longest):
+                        longest = path[:]
+                    if expand(depth + 1):
+                        return True
+                path.pop()
+                model.restore(saved)
+            return False
+
+        start = time.perf_counter()
+        root = model.snapshot()
+        try:
+            found = expand(0)
+        except BudgetExhausted:
+            found = False
+        model.restore(root)
+        elapsed = time.perf_counter() - start
+        self.searches += 1
+        self.search_time += elapsed
+        self.max_search_time = max(self.max_search_time, elapsed)
+        self.plan = path if found else longest
+
+    def decide(self):
+        self.search()
+        if not self.plan:
+            return self.model.ACTIONS[0]  # every choice loses; carry on
+        action = self.plan[0]
+        self.plan = self.plan[1:]
+        return action
+
+
+def play(game, seed, max_frames, node_budget=NODE_BUDGET):
+    """Play one game with the autopilot; returns (model, autopilot) once it ends."""
+    model = MODELS[game](seed)
+    pilot = Autopilot(model, node_budget)
+    while model.frames < max_frames:
+        if not model.advance(pilot.decide()):
+            break
+    return model, pilot
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Search-based autopilots for the experiment games")
+    parser.add_argument("--game", choices=sorted(MODELS), default="rara")
+    parser.add_argument("--games", type=int, default=1)
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--max-frames", type=int, default=10000, help="stop a game after this many frames")
+    parser.add_argument("--node-budget", type=int, default=NODE_BUDGET, help="search nodes per decision")
+    args = parser.parse_args(argv)
+
+    nodes = 0
+    search_time = 0.0
+    for index in range(args.games):
+        model, pilot = play(args.game, args.seed + index, args.max_frames, args.node_budget)
+        nodes += pilot.nodes
+        search_time += pilot.search_time
+        print(f"game {index + 1}: score {model.score}, {model.frames} frames, "
+              f"{pilot.nodes:,} nodes in {pilot.searches} searches "
+              f"(mean {pilot.search_time / pilot.searches * 1000:.2f} ms, "
+              f"max {pilot.max_search_time * 1000:.2f} ms)")
+    print(f"{nodes:,} nodes expanded, {nodes / search_time:,.0f} nodes/s")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,266 @@
+"""Headless benchmark suite for the experiment games.
+
+Each game is measured in three scenarios, each in a fresh subprocess running
+under SDL's dummy video and audio drivers:
+
+    update-only  game logic ticks (20x --frames of them), nothing drawn
+    draw-only    one mid-game frame drawn over and over, no logic, no flip
+    full-loop    the game's own main loop with --max-fps 0 --lockstep
+
+All runs use a fixed seed and a scripted input sequence, so every pass
+simulates exactly the same frames. Each scenario reports frames per second
+(best of ``--repeat`` timing passes), the peak traced memory, the net number
+of allocated blocks left behind, and how many garbage collections ran
+(generation-0 collections track allocation churn). The memory numbers come
+from a separate pass under ``tracemalloc`` so tracing never skews the FPS.
+
+Results are compared against a JSON baseline and the script exits with
+status 1 when any scenario regresses by more than ``--tolerance``.
+
+Usage:
+    python experiments/tools/bench.py                     # compare with the baseline
+    python experiments/tools/bench.py --update-baseline   # record a new baseline
+    python experiments/tools/bench.py --games rara --scenarios full-loop
+"""
+import argparse
+import gc
+import importlib.util
+import json
+import os
+import subprocess
+import sys
+import time
+import tracemalloc
+
+EXPERIMENTS = os.path.join(os.path.dirname(os.path.abspath(__file__)), os.pardir)
+GAMES = {
+    "rara": os.path.join(EXPERIMENTS, "01-rara-avis-game", "rara-avis.py"),
+    "car": os.path.join(EXPERIMENTS, "03-car-game", "car-game.py"),
+}
+SCENARIOS = ["update-only", "draw-only", "full-loop"]
+DEFAULT_BASELINE = os.path.join(os.path.dirname(os.path.abspath(__file__)), "bench_baseline.json")
+
+# Higher is better for fps; lower is better for everything else
+METRICS = {"fps": +1, "peak_kb": -1, "net_blocks": -1, "gc_collections": -1}
+# Differences below these are noise whatever the tolerance says
+ABSOLUTE_SLACK = {"fps": 0, "peak_kb": 64, "net_blocks": 200, "gc_collections": 5}
+
+WARMUP_TICKS = 120  # ticks played before a draw-only run, so pipes and obstacles are on screen
+UPDATE_ONLY_SCALE = 20  # logic ticks are cheap; run more of them so the timing is not just noise
+
+
+def load_game(name):
+    """Import a game script (their file names are not valid module names)."""
+    import pygame  # noqa: F401  (after the SDL drivers are set)
+
+    path = os.path.abspath(GAMES[name])
+    os.chdir(os.path.dirname(path))  # the games load their assets relative to their folder
+    sys.path.insert(0, os.path.dirname(path))
+    spec = importlib.util.spec_from_file_location(name.replace("-", "_"), path)
+    module = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(module)
+    return module
+
+
+def key_event(key):
+    import pygame
+    return pygame.event.Event(pygame.KEYDOWN, key=key, mod=0, unicode="", scancode=0)
+
+
+def rara_script(frame):
+    """Start the game, flap every 22 frames; a flap on the game-over screen restarts."""
+    import pygame
+    if frame == 0 or frame % 22 == 0:
+        return [key_event(pygame.K_SPACE)]
+    return []
+
+
+def car_script(frame):
+    """Swerve between lanes and restart shortly after every crash."""
+    import pygame
+    events = []
+    if frame % 45 == 0:
+        events.append(key_event(pygame.K_LEFT if frame // 45 % 2 else pygame.K_RIGHT))
+    if frame % 60 == 30:
+        events.append(key_event(pygame.K_r))
+    return events
+
+
+class RaraDriver:
+    def __init__(self, module, seed):
+        self.module = module
+        module.init_display()
+        module.build_layers()
+        self.game = module.Game(seed)
+
+    def tick(self, frame):
+        for event in rara_script(frame):
+            self.game.handle_event(event, (0, 0))
+        self.game.tick()
+
+    def draw(self):
+        self.module.sprites.validate()
+        self.game.draw(1.0)
+
+
+class CarDriver:
+    def __init__(self, module, seed):
+        self.module = module
+        module.init_display()
+        self.session = module.Session(seed)
+
+    def tick(self, frame):
+        for event in car_script(frame):
+            self.session.handle_event(event)
+        self.session.tick()
+
+    def draw(self):
+        self.session.game_state.draw(self.module.screen)
+
+
+DRIVERS = {"rara": RaraDriver, "car": CarDriver}
+SCRIPTS = {"rara": rara_script, "car": car_script}
+
+
+def prepare(game, scenario, frames, seed):
+    """Load the game and set up one scenario; returns a callable that runs it."""
+    import random
+    random.seed(seed)
+    module = load_game(game)
+
+    if scenario == "full-loop":
+        argv = ["--max-fps", "0", "--lockstep", "--frames", str(frames), "--seed", str(seed)]
+        return lambda: module.main(argv, input_script=SCRIPTS[game])
+
+    driver = DRIVERS[game](module, seed)
+    if scenario == "update-only":
+        def run():
+            for frame in range(frames * UPDATE_ONLY_SCALE):
+                driver.tick(frame)
+        return run
+
+    for frame in range(WARMUP_TICKS):
+        driver.tick(frame)
+
+    def run():
+        for _ in range(frames):
+            driver.draw()
+    return run
+
+
+def child(game, scenario, frames, seed, trace):
+    """Entry point of the measuring subprocess; prints one JSON line."""
+    run = prepare(game, scenario, frames, seed)
+    gc.collect()
+    collections = sum(stats["collections"] for stats in gc.get_stats())
+    if trace:
+        tracemalloc.start()
+    blocks = sys.getallocatedblocks()
+    start = time.perf_counter()
+    run()
+    result = {"seconds": time.perf_counter() - start, "frames": frames}
+    if trace:
+        _current, peak = tracemalloc.get_traced_memory()
+        tracemalloc.stop()
+        result["peak_kb"] = peak // 1024
+        result["net_blocks"] = sys.getallocatedblocks() - blocks
+        result["gc_collections"] = sum(stats["collections"] for stats in gc.get_stats()) - collections
+    print(json.dumps(result))
+
+
+def measure(game, scenario, frames, seed, repeat):
+    env = dict(os.environ, SDL_VIDEODRIVER="dummy", SDL_AUDIODRIVER="dummy", PYGAME_HIDE_SUPPORT_PROMPT="1")
+
+    def run(trace):
+        command = [sys.executable, os.path.abspath(__file__), "--child", game, scenario,
+                   "--frames", str(frames), "--seed", str(seed)]
+        if trace:
+            command.append("--trace")
+        output = subprocess.run(command, env=env, check=True, capture_output=True, text=True).stdout
+        return json.loads(output.strip().splitlines()[-1])
+
+    seconds = min(run(False)["seconds"] for _ in range(repeat))
+    traced = run(True)
+    if scenario == "update-only":
+        frames *= UPDATE_ONLY_SCALE
+    return {
+        "fps": round(frames / seconds, 1),
+        "peak_kb": traced["peak_kb"],
+        "net_blocks": traced["net_blocks"],
+        "gc_collections": traced["gc_collections"],
+    }
+
+
+def regressions(results, baseline, tolerance):
+    """List of human-readable regressions of ``results`` against ``baseline``."""
+    found = []
+    for key, metrics in results.items():
+        reference = baseline.get(key)
+        if reference is None:
+            continue
+        for metric, direction in METRICS.items():
+            if metric not in reference:
+                continue
+            old, new = reference[metric], metrics[metric]
+            worse = (old - new) if direction > 0 else (new - old)
+            if worse > max(abs(old) * tolerance, ABSOLUTE_SLACK[metric]):
+                found.append(f"{key} {metric}: {old} -> {new}")
+    return found
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Headless benchmarks for the experiment games")
+    parser.add_argument("--games", nargs="+", choices=sorted(GAMES), default=sorted(GAMES))
+    parser.add_argument("--scenarios", nargs="+", choices=SCENARIOS, default=SCENARIOS)
+    parser.add_argument("--frames", type=int, default=600, help="frames per scenario (default 600)")
+    parser.add_argument("--seed", type=int, default=1234)
+    parser.add_argument("--repeat", type=int, default=3, help="timing passes per scenario; the best counts")
+    parser.add_argument("--tolerance", type=float, default=0.25,
+                        help="allowed fractional regression per metric (default 0.25)")
+    parser.add_argument("--baseline", default=DEFAULT_BASELINE, help="baseline JSON file")
+    parser.add_argument("--update-baseline", action="store_true",
+                        help="write these results to the baseline instead of comparing")
+    parser.add_argument("--child", nargs=2, metavar=("GAME", "SCENARIO"), help=argparse.SUPPRESS)
+    parser.add_argument("--trace", action="store_true", help=argparse.SUPPRESS)
+    args = parser.parse_args(argv)
+
+    if args.child:
+        child(args.child[0], args.child[1], args.frames, args.seed, args.trace)
+        return 0
+
+    results = {}
+    print(f"{'scenario':<18} {'fps':>10} {'peak KB':>9} {'net blocks':>11} {'gc runs':>8}")
+    for game in args.games:
+        for scenario in args.scenarios:
+            key = f"{game}/{scenario}"
+            metrics = results[key] = measure(game, scenario, args.frames, args.seed, args.repeat)
+            print(f"{key:<18} {metrics['fps']:>10.1f} {metrics['peak_kb']:>9} "
+                  f"{metrics['net_blocks']:>11} {metrics['gc_collections']:>8}")
+
+    if args.update_baseline:
+        baseline = {}
+        if os.path.exists(args.baseline):
+            with open(args.baseline) as f:
+                baseline = json.load(f)
+        baseline.update(results)
+        with open(args.baseline, "w") as f:
+            json.dump(baseline, f, indent=2, sort_keys=True)
+            f.write("\n")
+        print(f"Baseline written to {args.baseline}")
+        return 0
+
+    if not os.path.exists(args.baseline):
+        print(f"No baseline at {args.baseline}; run with --update-baseline first.")
+        return 0
+    with open(args.baseline) as f:
+        baseline = json.load(f)
+    found = regressions(results, baseline, args.tolerance)
+    for line in found:
+        print("REGRESSION", line)
+    if not found:
+        print(f"No regressions beyond {args.tolerance:.0%} of the baseline.")
+    return 1 if found else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
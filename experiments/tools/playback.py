@@ -0,0 +1,108 @@
+"""Play back replay files recorded with a game's ``--record PATH``.
+
+By default the replay runs headless at full speed and is verified: at
+every keyframe, and at the end, the replayed game state must match the
+recorded one. A mismatch means the game no longer behaves as it did when
+the replay was made. ``--seek`` times a jump to a tick through the nearest
+keyframe against simulating from tick 0. ``--render`` opens the replay in
+the game window instead (the same as the game's ``--replay PATH``).
+
+Usage:
+    python experiments/01-rara-avis-game/rara-avis.py --record session.rvr
+    python experiments/tools/playback.py session.rvr
+    python experiments/tools/playback.py session.rvr --seek 36000
+    python experiments/tools/playback.py session.rvr --render --seek 36000
+"""
+import argparse
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), os.pardir, "shared"))
+from replay import Replay, ReplayPlayer, normalize, seek
+
+
+def new_session(module, replay):
+    """A fresh session of the replay's game, drawing to an offscreen surface."""
+    module.init_display(offscreen=True)
+    if replay.game == "rara":
+        module.build_layers()
+        return module.Game(replay.seed)
+    return module.Session(replay.seed)
+
+
+def verify(module, replay):
+    """Replay every tick; returns (ticks, seconds, first mismatching tick or None)."""
+    game = new_session(module, replay)
+    player = ReplayPlayer(replay)
+    keyframes = dict(replay.keyframes)
+    end = replay.ticks
+    mismatch = None
+    start = time.perf_counter()
+    while game.ticks < end:
+        player.apply(game)
+        game.tick()
+        expected = keyframes.get(game.ticks)
+        if expected is not None and normalize(game.keyframe()) != expected:
+            mismatch = game.ticks
+            break
+    if mismatch is None and replay.end is not None:
+        player.apply(game)  # actions taken after the last tick, e.g. just before quitting
+        if normalize(game.keyframe()) != replay.end[1]:
+            mismatch = game.ticks
+    return game.ticks, time.perf_counter() - start, mismatch
+
+
+def time_seek(module, replay, tick):
+    """Seconds to reach ``tick`` through keyframes, and by simulating from tick 0."""
+    game = new_session(module, replay)
+    start = time.perf_counter()
+    seek(replay, game, tick)
+    with_keyframes = time.perf_counter() - start
+
+    game = new_session(module, replay)
+    player = ReplayPlayer(replay)
+    start = time.perf_counter()
+    while game.ticks < tick:
+        player.apply(game)
+        game.tick()
+    return with_keyframes, time.perf_counter() - start
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Verify or watch a replay file")
+    parser.add_argument("replay", help="replay file written with --record")
+    parser.add_argument("--seek", type=int, metavar="TICK", help="time a seek to TICK")
+    parser.add_argument("--render", action="store_true", help="watch the replay in the game window")
+    args = parser.parse_args(argv)
+
+    replay = Replay.load(args.replay)
+    if not args.render:
+        os.environ.setdefault("SDL_VIDEODRIVER", "dummy")
+        os.environ.setdefault("SDL_AUDIODRIVER", "dummy")
+    path = os.path.abspath(args.replay)
+    from bench import load_game  # after the SDL drivers are set
+    module = load_game(replay.game)
+
+    if args.render:
+        module.main(["--replay", path, "--seek", str(args.seek or 0)])
+        return
+
+    print(f"{replay.game} replay, seed {replay.seed}: {replay.ticks} ticks, {len(replay.events)} actions, "
+          f"{len(replay.keyframes)} keyframes{'' if replay.end else ' (recording was cut short)'}")
+    ticks, elapsed, mismatch = verify(module, replay)
+    print(f"played {ticks} ticks in {elapsed:.2f}s ({ticks / max(elapsed, 1e-9):,.0f} ticks/s)")
+    if mismatch is not None:
+        print(f"MISMATCH: the replayed state differs from the recording at tick {mismatch}")
+        sys.exit(1)
+    print("OK: the replayed state matches every keyframe" + (" and the end state" if replay.end else ""))
+
+    if args.seek is not None:
+        tick = min(args.seek, replay.ticks)
+        with_keyframes, from_start = time_seek(module, replay, tick)
+        print(f"seek to tick {tick}: {with_keyframes * 1000:.1f} ms via keyframes, "
+              f"{from_start * 1000:.1f} ms from tick 0")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,325 @@
+"""Parallel rollouts of the experiment games for evaluating agents.
+
+``RolloutRunner`` shards a batch of environments across worker processes.
+Each worker steps its own slice of the batch, so every synchronisation
+covers many game frames and throughput scales with the number of cores.
+Actions, observations, rewards and done flags never get pickled. They live
+in ``multiprocessing.shared_memory`` arrays that the workers read and write
+in place, and a pair of barriers marks the start and end of each step. The
+agent runs in the parent process and sees the whole batch as NumPy arrays.
+
+Finished environments reset themselves with the next seed from their
+worker's seed sequence, like ``rara_batch.BatchSimulation``. The stats of
+the episode that just ended (score, frames survived and flaps or lane
+changes) are left in ``episode_stats`` for the rows flagged done.
+
+Usage:
+    runner = RolloutRunner("rara", workers=4, envs_per_worker=64, seed=0)
+    obs = runner.reset()
+    obs, rewards, dones = runner.step(actions)
+    runner.close()
+
+    python experiments/tools/rollout.py --game rara --episodes 5000 --workers 4
+"""
+import argparse
+import importlib.util
+import json
+import os
+import sys
+import time
+from multiprocessing import Barrier, Process, Value, shared_memory
+
+import numpy as np
+
+EXPERIMENTS = os.path.join(os.path.dirname(os.path.abspath(__file__)), os.pardir)
+sys.path.insert(0, os.path.join(EXPERIMENTS, "01-rara-avis-game"))
+
+RESET, STEP, CLOSE = 0, 1, 2
+BARRIER_TIMEOUT = 60  # seconds; a worker that died leaves the others waiting
+
+
+class RaraEnv:
+    """Rara Avis through the pygame-free rara_sim core. Action 1 flaps."""
+    OBS_SIZE = 5  # bird_y, velocity, pipe_dx, gap_top, gap_bottom
+    ACTIONS = 2
+    STAT_NAMES = ("score", "frames", "flap_count")
+
+    def __init__(self):
+        import rara_sim
+        self.sim = rara_sim.Simulation()
+        self.state = self.sim.get_state()
+
+    def reset(self, seed):
+        self.state = self.sim.reset(seed)
+
+    def step(self, action):
+        self.state, reward, done = self.sim.step(action == 1)
+        return reward, done
+
+    @property
+    def frames(self):
+        return self.sim.frame
+
+    def observation(self):
+        return self.state
+
+    def stats(self):
+        return (self.sim.score, self.sim.frame, self.sim.bird.flap_count)
+
+
+class CarEnv:
+    """The car game's GameState, ticked without a display. Actions: 0 stay, 1 left, 2 right."""
+    OBS_SIZE = 1 + 3  # lane, then the distance to the next cone in each lane
+    ACTIONS = 3
+    STAT_NAMES = ("score", "frames", "lane_changes")
+    module = None
+
+    def __init__(self):
+        if CarEnv.module is None:
+            os.environ.setdefault("PYGAME_HIDE_SUPPORT_PROMPT", "1")
+            path = os.path.join(EXPERIMENTS, "03-car-game", "car-game.py")
+            spec = importlib.util.spec_from_file_location("car_game", path)
+            CarEnv.module = importlib.util.module_from_spec(spec)
+            spec.loader.exec_module(CarEnv.module)
+        self.game = None
+        self.lane_changes = 0
+
+    def reset(self, seed):
+        self.game = self.module.GameState(seed)
+        self.lane_changes = 0
+
+    def step(self, action):
+        car = self.game.car
+        lane = car.lane
+        if action == 1:
+            car.move_left()
+        elif action == 2:
+            car.move_right()
+        self.lane_changes += car.lane != lane
+        score = self.game.score
+        self.game.update()
+        return self.game.score - score, self.game.game_over
+
+    @property
+    def frames(self):
+        return self.game.score  # the score counts ticks survived
+
+    def observation(self):
+        car = self.game.car
+        observation = [car.lane]
+        for obstacles in self.game.lanes:
+            # Lanes run from the lowest cone up; the first one not yet passed is the next
+            distance = self.module.SCREEN_HEIGHT
+            for obstacle in obstacles:
+                if obstacle.y < car.y + car.height:
+                    distance = min(distance, car.y - (obstacle.y + obstacle.height))
+                    break
+            observation.append(distance)
+        return observation
+
+    def stats(self):
+        return (self.game.score, self.game.score, self.lane_changes)
+
+
+ENVS = {"rara": RaraEnv, "car": CarEnv}
+
+
+def shared_array(shape, dtype, name=None):
+    """A NumPy array backed by shared memory; creates the block unless ``name`` is given."""
+    size = int(np.prod(shape)) * np.dtype(dtype).itemsize
+    block = shared_memory.SharedMemory(name=name, create=name is None, size=max(size, 1))
+    return block, np.ndarray(shape, dtype=dtype, buffer=block.buf)
+
+
+def worker(game, start, stop, seed, max_frames, names, shapes, command, begin, end):
+    env_class = ENVS[game]
+    blocks, arrays = zip(*(shared_array(shape, dtype, name) for name, (shape, dtype) in zip(names, shapes)))
+    obs, actions, rewards, dones, stats = (array[start:stop] for array in arrays)
+    envs = [env_class() for _ in range(stop - start)]
+    seeds = np.random.default_rng(seed)
+
+    def reset(env):
+        env.reset(int(seeds.integers(2**31)))
+
+    try:
+        while True:
+            begin.wait(BARRIER_TIMEOUT)
+            if command.value == CLOSE:
+                break
+            if command.value == RESET:
+                for env in envs:
+                    reset(env)
+                rewards[:] = 0
+                dones[:] = False
+            else:
+                # Work on Python lists and write each shared array once per step
+                step_rewards = []
+                step_dones = []
+                for i, (env, action) in enumerate(zip(envs, actions.tolist())):
+                    reward, done = env.step(action)
+                    done = done or env.frames >= max_frames
+                    step_rewards.append(reward)
+                    step_dones.append(done)
+                    if done:
+                        stats[i] = env.stats()
+                        reset(env)
+                rewards[:] = step_rewards
+                dones[:] = step_dones
+            obs[:] = [env.observation() for env in envs]
+            end.wait(BARRIER_TIMEOUT)
+    finally:
+        del obs, actions, rewards, dones, stats, arrays
+        for block in blocks:
+            block.close()
+
+
+class RolloutRunner:
+    def __init__(self, game, workers=None, envs_per_worker=64, seed=0, max_frames=10000):
+        self.game = game
+        self.env_class = ENVS[game]
+        self.workers = workers or os.cpu_count() or 1
+        self.num_envs = self.workers * envs_per_worker
+        n = self.num_envs
+        shapes = [
+            ((n, self.env_class.OBS_SIZE), np.float32),  # obs
+            ((n,), np.int8),  # actions
+            ((n,), np.float32),  # rewards
+            ((n,), np.bool_),  # dones
+            ((n, len(self.env_class.STAT_NAMES)), np.int64),  # stats of the episode that just ended
+        ]
+        self.blocks, arrays = zip(*(shared_array(shape, dtype) for shape, dtype in shapes))
+        self.obs, self.actions, self.rewards, self.dones, self.episode_stats = arrays
+
+        self.steps = 0
+        self.command = Value("b", RESET, lock=False)
+        self.begin = Barrier(self.workers + 1)
+        self.end = Barrier(self.workers + 1)
+        names = [block.name for block in self.blocks]
+        # One independent seed stream per worker
+        seeds = np.random.SeedSequence(seed).spawn(self.workers)
+        self.processes = []
+        for index in range(self.workers):
+            start, stop = index * envs_per_worker, (index + 1) * envs_per_worker
+            process = Process(target=worker, daemon=True,
+                              args=(game, start, stop, seeds[index], max_frames, names, shapes,
+                                    self.command, self.begin, self.end))
+            process.start()
+            self.processes.append(process)
+
+    def run_command(self, command):
+        self.command.value = command
+        self.begin.wait(BARRIER_TIMEOUT)
+        if command != CLOSE:
+            self.end.wait(BARRIER_TIMEOUT)
+
+    def reset(self):
+        self.run_command(RESET)
+        return self.obs
+
+    def step(self, actions):
+        """Step every environment. The returned arrays are views that the next step overwrites."""
+        self.actions[:] = actions
+        self.run_command(STEP)
+        self.steps += 1
+        return self.obs, self.rewards, self.dones
+
+    def close(self):
+        if not self.processes:
+            return
+        self.run_command(CLOSE)
+        for process in self.processes:
+            process.join()
+        self.processes = []
+        self.obs = self.actions = self.rewards = self.dones = self.episode_stats = None
+        for block in self.blocks:
+            try:
+                block.close()
+            except BufferError:
+                pass  # the caller still holds a view; the mapping goes when it does
+            block.unlink()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+
+def rara_heuristic(obs, rng):
+    # Same rule as rara_sim.main: flap when falling towards the bottom of the gap
+    bird_y, velocity, gap_bottom = obs[:, 0], obs[:, 1], obs[:, 4]
+    return ((velocity > 0) & (bird_y + 30 > gap_bottom - 40)).astype(np.int8)
+
+
+def car_heuristic(obs, rng):
+    # Head for the lane whose next cone is farthest away once this lane's gets close
+    lane = obs[:, 0].astype(np.int64)
+    distances = obs[:, 1:]
+    ahead = distances[np.arange(len(obs)), lane]
+    best = distances.argmax(axis=1)
+    move = np.where(best < lane, 1, np.where(best > lane, 2, 0))
+    return np.where(ahead < 150, move, 0).astype(np.int8)
+
+
+def random_policy(actions):
+    def policy(obs, rng):
+        return rng.integers(0, actions, len(obs), dtype=np.int8)
+    return policy
+
+
+POLICIES = {
+    "rara": {"heuristic": rara_heuristic, "random": random_policy(RaraEnv.ACTIONS)},
+    "car": {"heuristic": car_heuristic, "random": random_policy(CarEnv.ACTIONS)},
+}
+
+
+def rollout(runner, policy, episodes, seed=0):
+    """Step until ``episodes`` episodes have finished; returns their stats as an (episodes, k) array."""
+    rng = np.random.default_rng(seed)
+    finished = []
+    count = 0
+    obs = runner.reset()
+    while count < episodes:
+        obs, _rewards, dones = runner.step(policy(obs, rng))
+        if dones.any():
+            stats = runner.episode_stats[dones].copy()
+            finished.append(stats)
+            count += len(stats)
+    return np.concatenate(finished)[:episodes]
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Parallel rollouts of the experiment games")
+    parser.add_argument("--game", choices=sorted(ENVS), default="rara")
+    parser.add_argument("--policy", choices=["heuristic", "random"], default="heuristic")
+    parser.add_argument("--episodes", type=int, default=2000)
+    parser.add_argument("--workers", type=int, default=os.cpu_count(), help="worker processes (default: one per core)")
+    parser.add_argument("--envs-per-worker", type=int, default=64)
+    parser.add_argument("--max-frames", type=int, default=10000, help="end an episode after this many frames")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--json", metavar="PATH", help="write the per-episode stats to PATH")
+    args = parser.parse_args(argv)
+
+    names = ENVS[args.game].STAT_NAMES
+    start = time.perf_counter()
+    with RolloutRunner(args.game, args.workers, args.envs_per_worker, args.seed, args.max_frames) as runner:
+        stats = rollout(runner, POLICIES[args.game][args.policy], args.episodes, args.seed)
+
+        frames = runner.steps * runner.num_envs
+    elapsed = time.perf_counter() - start
+
+    print(f"{len(stats)} episodes of {args.game} ({args.policy}) on {args.workers} workers "
+          f"x {args.envs_per_worker} envs in {elapsed:.2f}s")
+    print(f"{frames:,} frames stepped, {frames / elapsed:,.0f} frames/s, {len(stats) / elapsed:,.1f} episodes/s")
+    for i, name in enumerate(names):
+        column = stats[:, i]
+        print(f"  {name:<13} mean {column.mean():10.1f}  median {np.median(column):8.0f}  max {column.max():8d}")
+
+    if args.json:
+        with open(args.json, "w") as f:
+            json.dump({"game": args.game, "policy": args.policy, "seed": args.seed, "stat_names": names,
+                       "episodes": stats.tolist()}, f)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,53 @@
+"""Replays recorded outside lockstep must verify, including input after the last tick.
+
+Usage:
+    python -m unittest discover -s experiments/tools -p "test_*.py"
+"""
+import os
+import sys
+import tempfile
+import unittest
+
+os.environ.setdefault("SDL_VIDEODRIVER", "dummy")
+os.environ.setdefault("SDL_AUDIODRIVER", "dummy")
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+from bench import load_game
+from playback import new_session, verify
+from replay import Replay, ReplayWriter
+
+
+class InputOnLastTickTest(unittest.TestCase):
+    def record(self, module, name, actions_before, ticks, last_action):
+        """Record ``ticks`` ticks, then an action after the last one, as a frame without a tick would."""
+        directory = tempfile.TemporaryDirectory()
+        self.addCleanup(directory.cleanup)
+        path = os.path.join(directory.name, name + ".rvr")
+        game = new_session(module, Replay(name, 5, 0))
+        game.recorder = ReplayWriter(path, name, 5)
+        for action in actions_before:
+            game.act(action)
+        for _ in range(ticks):
+            game.tick()
+        game.act(last_action)
+        game.recorder.close(game.ticks, game.keyframe())
+        return Replay.load(path)
+
+    def assert_verifies(self, module, replay):
+        self.assertEqual(replay.events[-1][0], replay.ticks)
+        ticks, _, mismatch = verify(module, replay)
+        self.assertEqual(ticks, replay.ticks)
+        self.assertIsNone(mismatch)
+
+    def test_car(self):
+        module = load_game("car")
+        replay = self.record(module, "car", [], 39, module.LEFT)
+        self.assert_verifies(module, replay)
+
+    def test_rara(self):
+        module = load_game("rara")
+        replay = self.record(module, "rara", [module.START], 55, module.FLAP)
+        self.assert_verifies(module, replay)
+
+
+if __name__ == "__main__":
+    unittest.main()